@@ -61,6 +61,24 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered timetable exports. Keys carry the timetable's content version,
+    # so entries never go stale; the least recently used ones are evicted
+    # once MAX_ENTRIES is reached.
+    'exports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'timetable-exports',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 200,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -89,6 +107,27 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Background export rendering (timetable/jobs.py)
+# Rendering is CPU-bound; half the cores leaves the rest to the web workers
+TIMETABLE_EXPORT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+TIMETABLE_EXPORT_JOB_TIMEOUT = 600  # seconds before a pending job counts as lost
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # e.g. PDF exports falling back to the simple layout
+        'timetable': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# Extra folders searched for image export fonts before the system font
+# folders; timetable/fonts bundles a fallback (see timetable/fonts/__init__.py)
+TIMETABLE_FONT_DIRS = []
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = 'login'
@@ -4,12 +4,12 @@ from .models import Department, Faculty, TimetableEntry
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
-    list_display = ['name']
+    list_display = ['name', 'semester_count', 'active_semester']
     search_fields = ['name']
 
 @admin.register(Faculty)
 class FacultyAdmin(admin.ModelAdmin):
-    list_display = ['name', 'department']
+    list_display = ['name', 'department', 'user']
     list_filter = ['department']
     search_fields = ['name']
 
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class TimetableConfig(AppConfig):
     name = 'timetable'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .fonts import resolve_fonts
+        resolve_fonts()
@@ -0,0 +1,122 @@
+# timetable/availability.py
+"""
+Weekly availability as bitmasks, for finding common free time.
+
+Each teacher's and each timetable's (department, semester) week is one
+integer with a bit per TICK_MINUTES of every day in DAYS, set where they
+are busy. A teacher is busy with their entries in every department's
+active semester (the rule find_faculty_conflicts applies); a class is busy
+with every entry of its timetable, breaks included. The masks of any mix
+of teachers and classes are OR-ed together and the free windows read off
+the result, so a query over dozens of them is a handful of integer
+operations instead of SQL round trips.
+
+All masks are built from one pass over TimetableEntry, kept in this
+process and dropped whenever an entry, department or faculty is written
+(see signals.py). Other worker processes rebuild after RELOAD_AFTER
+seconds at most. Entries are still checked in SQL when they are created,
+so a stale mask can only produce a stale suggestion, never a clash.
+"""
+import time as _time
+from datetime import time
+
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+
+from .grid import DAYS
+from .models import TimetableEntry
+
+TICK_MINUTES = 5
+TICKS_PER_DAY = 24 * 60 // TICK_MINUTES
+DEFAULT_DAY_START = time(9)
+DEFAULT_DAY_END = time(17)
+RELOAD_AFTER = 60  # seconds
+
+_availability = None
+_loaded_at = 0.0
+
+
+def _tick(value, round_up=False):
+    minutes = value.hour * 60 + value.minute
+    ticks, remainder = divmod(minutes, TICK_MINUTES)
+    return ticks + (1 if round_up and remainder else 0)
+
+def _time_of(tick):
+    minutes = min(tick * TICK_MINUTES, 24 * 60 - 1)
+    return time(minutes // 60, minutes % 60)
+
+def span_mask(day, start_time, end_time):
+    """Bits of `day` from start_time up to end_time, widened to whole ticks"""
+    start, end = _tick(start_time), _tick(end_time, round_up=True)
+    if day not in DAYS or end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << (DAYS.index(day) * TICKS_PER_DAY + start)
+
+
+class Availability:
+    def __init__(self, faculty=None, timetables=None):
+        self.faculty = faculty or {}  # faculty id -> busy mask
+        self.timetables = timetables or {}  # (department id, semester) -> busy mask
+
+    @classmethod
+    def build(cls):
+        faculty, timetables = {}, {}
+        rows = TimetableEntry.objects.annotate(
+            active=ExpressionWrapper(Q(semester=F('department__active_semester')), output_field=BooleanField()),
+        ).values_list('faculty_id', 'department_id', 'semester', 'day', 'start_time', 'end_time', 'active')
+
+        for faculty_id, department_id, semester, day, start_time, end_time, active in rows.iterator(chunk_size=5000):
+            mask = span_mask(day, start_time, end_time)
+            key = (department_id, semester)
+            timetables[key] = timetables.get(key, 0) | mask
+            if faculty_id is not None and active:
+                faculty[faculty_id] = faculty.get(faculty_id, 0) | mask
+        return cls(faculty, timetables)
+
+    def busy(self, faculty_ids=(), timetables=()):
+        mask = 0
+        for faculty_id in faculty_ids:
+            mask |= self.faculty.get(faculty_id, 0)
+        for timetable in timetables:
+            mask |= self.timetables.get(timetable, 0)
+        return mask
+
+    def free_slots(self, faculty_ids=(), timetables=(), minutes=TICK_MINUTES, days=DAYS,
+                   day_start=DEFAULT_DAY_START, day_end=DEFAULT_DAY_END):
+        """
+        (day, start_time, end_time) of every window of at least `minutes`
+        between day_start and day_end on `days` when all the given teachers
+        (ids) and timetables ((department id, semester)) are free.
+        """
+        busy = self.busy(faculty_ids, timetables)
+        needed = max(1, -(-minutes // TICK_MINUTES))
+        first, last = _tick(day_start, round_up=True), _tick(day_end)
+        if last <= first:
+            return []
+        window = ((1 << (last - first)) - 1) << first
+
+        slots = []
+        for day in days:
+            if day not in DAYS:
+                continue
+            free = ~(busy >> (DAYS.index(day) * TICKS_PER_DAY)) & window
+            # Walk the runs of set bits, lowest first
+            while free:
+                start = (free & -free).bit_length() - 1
+                run = free >> start
+                length = (~run & (run + 1)).bit_length() - 1
+                if length >= needed:
+                    slots.append((day, _time_of(start), _time_of(start + length)))
+                free &= ~(((1 << length) - 1) << start)
+        return slots
+
+
+def get_availability():
+    global _availability, _loaded_at
+    if _availability is None or _time.monotonic() - _loaded_at > RELOAD_AFTER:
+        _availability = Availability.build()
+        _loaded_at = _time.monotonic()
+    return _availability
+
+def clear_availability():
+    global _availability
+    _availability = None
@@ -0,0 +1,48 @@
+# timetable/conflicts.py
+from django.db.models import F, Q
+
+from .models import TimetableEntry
+
+
+def find_faculty_conflicts(faculties, slots, current_dept=None, exclude_ids=(), is_lab=False):
+    """
+    Returns every entry that keeps one of `faculties` busy during one of
+    `slots` (an iterable of (day, start_time, end_time) tuples).
+
+    An entry only counts if it belongs to the semester currently marked
+    'Active' for THAT department, and for lab sessions entries of the same
+    department are allowed (several teachers share a lab). Both rules run
+    in SQL, so the whole set of faculty and slots is checked in one query.
+    """
+    faculties = [faculty for faculty in faculties if faculty]
+    slots = list(slots)
+    if not faculties or not slots:
+        return []
+
+    overlaps = Q()
+    for day, start_time, end_time in slots:
+        overlaps |= Q(day=day, start_time__lt=end_time, end_time__gt=start_time)
+
+    conflicts = TimetableEntry.objects.filter(
+        overlaps,
+        faculty__in=faculties,
+        semester=F('department__active_semester'),
+    )
+
+    if exclude_ids:
+        conflicts = conflicts.exclude(id__in=exclude_ids)
+
+    if is_lab and current_dept is not None:
+        conflicts = conflicts.exclude(department=current_dept)
+
+    return list(
+        conflicts.select_related('department', 'faculty')
+        .order_by('faculty__name', 'day', 'start_time')
+    )
+
+def conflict_message(conflict):
+    return (
+        f'CONFLICT: {conflict.faculty.name} is already assigned to '
+        f'{conflict.department.name} ({conflict.semester}) on {conflict.day} '
+        f'{conflict.start_time.strftime("%I:%M %p")} - {conflict.end_time.strftime("%I:%M %p")}'
+    )
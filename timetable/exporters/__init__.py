@@ -0,0 +1,90 @@
+# timetable/exporters/__init__.py
+"""
+Renderers that turn a TimetableGrid into a downloadable file.
+
+Every exporter takes the grid built once per request and returns the file
+contents as bytes; they never query the database themselves. The
+college-wide dumps in stream.py are the exception: they are generators that
+read the database as they go.
+
+The renderers are named here, not imported: reportlab, openpyxl, python-docx
+and Pillow are only loaded the first time a format is rendered, so web
+workers that never serve a download never pay for them.
+"""
+from importlib import import_module
+
+from .encoding import DEFAULT_IMAGE_MODE, IMAGE_MODES
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+class ExportFormat:
+    def __init__(self, name, renderer, content_type, extension, inline=False):
+        self.name = name
+        self.renderer = renderer  # 'module.function' within this package
+        self.content_type = content_type
+        self.extension = extension
+        self.inline = inline
+
+    @property
+    def render(self):
+        """The render function, importing its module on first use"""
+        module_name, function_name = self.renderer.rsplit('.', 1)
+        return getattr(import_module(f'.{module_name}', __name__), function_name)
+
+    def options_from(self, query):
+        """Render options taken from the request's query string"""
+        return {}
+
+    def content_type_for(self, options):
+        return self.content_type
+
+    def extension_for(self, options):
+        return self.extension
+
+    def filename(self, department, semester, options=None):
+        if not self.inline:
+            semester = semester.replace(' ', '_')
+        return f"{department.name}_{semester}_Timetable.{self.extension_for(options or {})}"
+
+
+class ImageExportFormat(ExportFormat):
+    """
+    PNG/WebP image, encoded as chosen with ?mode=png|palette|webp and
+    ?level=0-9 (encode speed vs. size)
+    """
+
+    def options_from(self, query):
+        mode = query.get('mode')
+        if mode not in IMAGE_MODES:
+            mode = DEFAULT_IMAGE_MODE
+        try:
+            level = min(max(int(query['level']), 0), 9)
+        except (KeyError, ValueError):
+            level = IMAGE_MODES[mode].default_level
+        return {'mode': mode, 'level': level}
+
+    def content_type_for(self, options):
+        return IMAGE_MODES[options.get('mode', DEFAULT_IMAGE_MODE)].content_type
+
+    def extension_for(self, options):
+        return IMAGE_MODES[options.get('mode', DEFAULT_IMAGE_MODE)].extension
+
+
+EXPORT_FORMATS = {
+    export.name: export for export in [
+        ExportFormat('pdf', 'pdf.render_pdf', 'application/pdf', 'pdf'),
+        ExportFormat('excel', 'excel.render_excel', XLSX_CONTENT_TYPE, 'xlsx'),
+        ExportFormat('csv', 'text.render_csv', 'text/csv', 'csv'),
+        ExportFormat('json', 'text.render_json', 'application/json', 'json'),
+        ExportFormat('word', 'word.render_word', DOCX_CONTENT_TYPE, 'docx'),
+        ImageExportFormat('image', 'image.render_image', 'image/png', 'png'),
+        ImageExportFormat('share-image', 'image.render_share_image', 'image/png', 'png', inline=True),
+    ]
+}
+
+
+def render_export(format_name, grid, options=None):
+    """Render `grid` in the given format and return the file contents"""
+    return EXPORT_FORMATS[format_name].render(grid, **(options or {}))
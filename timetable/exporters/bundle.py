@@ -0,0 +1,128 @@
+# timetable/exporters/bundle.py
+"""
+ZIP bundle of every department x semester timetable in several formats.
+
+All entries are fetched in one query and grouped into grids in memory.
+Renders that are not in the export cache yet go to the background process
+pool, and each file is written into the ZIP, and on to the client, as soon
+as it is ready. Only a few renders are in flight at a time and each one is
+dropped once written, so memory does not grow with the number of
+timetables.
+"""
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..grid import TimetableGrid
+from ..models import TimetableVersion
+from . import EXPORT_FORMATS, render_export
+from .cache import export_cache_key
+
+# Formats that are already compressed gain nothing from deflate
+COMPRESSIBLE_FORMATS = {'csv', 'json'}
+# Renders queued per pool worker, enough to keep every worker busy
+IN_FLIGHT_PER_WORKER = 2
+
+
+class _ZipStream:
+    """Write-only file object that buffers what ZipFile writes until read"""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def read(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def bundle_filename(format_name, grid):
+    department = grid.department
+    return f"{department.name}/{EXPORT_FORMATS[format_name].filename(department, grid.semester)}"
+
+def stream_bundle(format_names, executor, max_in_flight=None):
+    """
+    Yields the bytes of a ZIP holding every timetable in `format_names`,
+    rendering cache misses on `executor` (see jobs.get_executor()), at most
+    `max_in_flight` at a time.
+    """
+    if max_in_flight is None:
+        max_in_flight = IN_FLIGHT_PER_WORKER * (getattr(settings, 'TIMETABLE_EXPORT_WORKERS', None) or 1)
+
+    # Versions are read before the entries: an edit in between only makes a
+    # cached render newer than its key, never older
+    versions = {
+        (department_id, semester): version
+        for department_id, semester, version in
+        TimetableVersion.objects.values_list('department_id', 'semester', 'version')
+    }
+    grids = TimetableGrid.for_college()
+
+    # Default options, so single downloads and bundles share cache entries
+    options = {name: EXPORT_FORMATS[name].options_from({}) for name in format_names}
+
+    cache = caches['exports']
+    keys = {
+        (format_name, index): export_cache_key(
+            format_name, grid.department, grid.semester,
+            versions.get((grid.department.id, grid.semester), 0),
+            options[format_name]
+        )
+        for index, grid in enumerate(grids)
+        for format_name in format_names
+    }
+    # Cached renders are only read one at a time, as they are written
+    cached, missing = [], deque()
+    for item, key in keys.items():
+        (cached if cache.has_key(key) else missing).append(item)
+
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode='w')
+
+    def add(format_name, grid, content):
+        compress_type = zipfile.ZIP_DEFLATED if format_name in COMPRESSIBLE_FORMATS else zipfile.ZIP_STORED
+        archive.writestr(bundle_filename(format_name, grid), content, compress_type=compress_type)
+        return stream.read()
+
+    in_flight = {}
+
+    def submit():
+        while missing and len(in_flight) < max_in_flight:
+            format_name, index = missing.popleft()
+            future = executor.submit(render_export, format_name, grids[index], options[format_name])
+            in_flight[future] = (format_name, index)
+
+    try:
+        submit()
+        for format_name, index in cached:
+            content = cache.get(keys[format_name, index])
+            if content is None:
+                missing.append((format_name, index))  # Evicted meanwhile
+            else:
+                yield add(format_name, grids[index], content)
+
+        submit()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                format_name, index = in_flight.pop(future)
+                content = future.result()
+                cache.set(keys[format_name, index], content)
+                yield add(format_name, grids[index], content)
+            submit()
+
+        archive.close()
+        yield stream.read()
+    finally:
+        # Client went away (or a render failed): drop what has not started
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,35 @@
+# timetable/exporters/cache.py
+import hashlib
+
+from django.core.cache import caches
+
+from ..grid import TimetableGrid
+from . import render_export
+
+
+def export_cache_key(format_name, department, semester, version, options=None):
+    # The department name is printed in every export, so a rename must miss
+    raw = f'{department.id}:{department.name}:{semester}:{format_name}:{version}'
+    if options:
+        raw += ':' + ':'.join(f'{key}={value}' for key, value in sorted(options.items()))
+    return 'timetable-export:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def get_cached_export(format_name, department, semester, version, options=None):
+    return caches['exports'].get(export_cache_key(format_name, department, semester, version, options))
+
+def cache_export(format_name, department, semester, version, options, content):
+    caches['exports'].set(export_cache_key(format_name, department, semester, version, options), content)
+
+def render_cached_export(format_name, department, semester, version, options=None):
+    """
+    Returns the rendered export for this exact timetable version, rendering
+    (one query + the exporter) only when it is not cached yet. Any change to
+    the timetable bumps its version, so old renders are simply never hit
+    again and age out of the LRU cache.
+    """
+    content = get_cached_export(format_name, department, semester, version, options)
+    if content is None:
+        grid = TimetableGrid.for_semester(department, semester)
+        content = render_export(format_name, grid, options)
+        cache_export(format_name, department, semester, version, options, content)
+    return content
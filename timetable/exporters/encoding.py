@@ -0,0 +1,64 @@
+# timetable/exporters/encoding.py
+"""
+Output modes of the image exporters: how a drawn PIL image is encoded.
+
+Kept apart from image.py so the export registry can parse ?mode= and pick
+content types without importing Pillow.
+"""
+import io
+
+
+class ImageMode:
+    """
+    One way of encoding the drawn image. `level` (0-9) trades encode time
+    for file size, like zlib levels; each mode maps it to its own knobs.
+    """
+
+    def __init__(self, name, content_type, extension, default_level, encode):
+        self.name = name
+        self.content_type = content_type
+        self.extension = extension
+        self.default_level = default_level
+        self.encode = encode
+
+
+def _save(image, **params):
+    buffer = io.BytesIO()
+    image.save(buffer, **params)
+    return buffer.getvalue()
+
+def encode_png(image, level):
+    """Full RGB PNG"""
+    return _save(image, format='PNG', compress_level=level)
+
+def encode_palette_png(image, level):
+    """
+    PNG with a 64 colour palette. The timetable is flat colours plus
+    anti-aliased text, so this is visually lossless at a third of the size.
+    Median cut keeps the flat background colours exact; low levels use the
+    much faster octree quantizer, which may shift them slightly.
+    """
+    from PIL import Image
+
+    method = Image.Quantize.FASTOCTREE if level <= 3 else Image.Quantize.MEDIANCUT
+    palette_image = image.quantize(colors=64, method=method, dither=Image.Dither.NONE)
+    return _save(palette_image, format='PNG', compress_level=level)
+
+def encode_webp(image, level):
+    """Lossless WebP; for lossless encoding `quality` is the effort spent"""
+    return _save(image, format='WEBP', lossless=True, quality=100, method=level * 6 // 9)
+
+
+IMAGE_MODES = {
+    mode.name: mode for mode in [
+        ImageMode('png', 'image/png', 'png', 6, encode_png),
+        ImageMode('palette', 'image/png', 'png', 9, encode_palette_png),
+        ImageMode('webp', 'image/webp', 'webp', 6, encode_webp),
+    ]
+}
+DEFAULT_IMAGE_MODE = 'palette'
+
+
+def encode_image(image, mode=DEFAULT_IMAGE_MODE, level=None):
+    image_mode = IMAGE_MODES[mode]
+    return image_mode.encode(image, image_mode.default_level if level is None else level)
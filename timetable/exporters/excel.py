@@ -0,0 +1,198 @@
+# timetable/exporters/excel.py
+"""
+Excel export in openpyxl's write-only mode.
+
+Rows are streamed into the sheet XML as they are appended instead of being
+kept as cell objects, and every cell refers to one of a handful of named
+styles registered once per workbook, so a workbook holding the whole college
+costs little more memory than a single timetable.
+"""
+import io
+import re
+from datetime import datetime
+from itertools import groupby
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+CENTER = Alignment(horizontal='center', vertical='center')
+CENTER_WRAP = Alignment(horizontal='center', vertical='center', wrap_text=True)
+DEFAULT_FONT = Font(name='Calibri', size=11)
+
+# name -> NamedStyle keyword arguments
+STYLES = {
+    'Timetable Title': dict(font=Font(name='Calibri', size=16, bold=True), alignment=CENTER),
+    'Timetable Department': dict(font=Font(name='Calibri', size=14, bold=True, color="7030A0"), alignment=CENTER),
+    'Timetable Semester': dict(font=Font(name='Calibri', size=12, bold=True, color="00B050"), alignment=CENTER),
+    'Timetable Header': dict(
+        fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+        font=Font(name='Calibri', size=12, bold=True, color="FFFFFF"),
+        alignment=CENTER_WRAP, border=THIN_BORDER,
+    ),
+    'Timetable Time': dict(
+        fill=PatternFill(start_color="E6E6E6", end_color="E6E6E6", fill_type="solid"),
+        font=Font(name='Calibri', size=11, bold=True),
+        alignment=CENTER_WRAP, border=THIN_BORDER,
+    ),
+    # We can't format individual lines, so a cell uses the subject font
+    'Timetable Subject': dict(font=Font(name='Calibri', size=10, bold=True), alignment=CENTER_WRAP, border=THIN_BORDER),
+    'Timetable Lab': dict(font=Font(name='Calibri', size=10, bold=True, color="2E75B5"),
+                          alignment=CENTER_WRAP, border=THIN_BORDER),
+    'Timetable Empty': dict(font=DEFAULT_FONT, alignment=CENTER_WRAP, border=THIN_BORDER),
+    'Signature Line': dict(font=DEFAULT_FONT, alignment=Alignment(horizontal='center')),
+    'Signature Title': dict(font=Font(bold=True), alignment=Alignment(horizontal='center')),
+    'Signature Detail': dict(font=Font(italic=True), alignment=Alignment(horizontal='center')),
+    'Generated On': dict(font=Font(italic=True, color="666666"), alignment=Alignment(horizontal='center')),
+}
+
+ROW_HEIGHT = 40
+COLUMN_WIDTHS = {'A': 15}  # Time column; day columns are 20 wide
+
+
+def new_workbook():
+    """Write-only workbook with the timetable named styles registered"""
+    wb = Workbook(write_only=True)
+    for name, attributes in STYLES.items():
+        wb.add_named_style(NamedStyle(name=name, **attributes))
+    return wb
+
+
+class SheetWriter:
+    """Appends rows to a write-only sheet, keeping track of the row number"""
+
+    def __init__(self, ws, columns):
+        self.ws = ws
+        self.columns = columns
+        self.row = 0
+        for col_idx in range(1, columns + 1):
+            letter = get_column_letter(col_idx)
+            ws.column_dimensions[letter].width = COLUMN_WIDTHS.get(letter, 20)
+
+    def cell(self, value, style):
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def append(self, cells=(), height=None, merge=()):
+        self.row += 1
+        if height:
+            self.ws.row_dimensions[self.row].height = height
+        for start, end in merge:
+            self.ws.merged_cells.add(
+                f"{get_column_letter(start)}{self.row}:{get_column_letter(end)}{self.row}"
+            )
+        self.ws.append(list(cells))
+
+    def banner(self, text, style):
+        self.append([self.cell(text, style)], merge=[(1, self.columns)])
+
+    def blank(self, count=1):
+        for _ in range(count):
+            self.append()
+
+
+def write_timetable(writer, grid):
+    """Semester heading and the timetable table of one grid"""
+    writer.banner(f"{grid.semester} Timetable", 'Timetable Semester')
+    writer.blank()
+
+    writer.append(
+        [writer.cell(header, 'Timetable Header') for header in ['Time Slot'] + grid.days],
+        height=ROW_HEIGHT,
+    )
+    for row in grid.rows:
+        cells = [writer.cell(row.label, 'Timetable Time')]
+        for timetable_cell in row.cells:
+            if timetable_cell.is_lab:
+                style = 'Timetable Lab'
+            elif timetable_cell:
+                style = 'Timetable Subject'
+            else:
+                style = 'Timetable Empty'
+            # Line breaks inside the cell, like CHAR(10) in a formula
+            value = "\n".join(timetable_cell.lines()) if timetable_cell else "-"
+            cells.append(writer.cell(value, style))
+        writer.append(cells, height=ROW_HEIGHT)
+
+def write_sheet(ws, department, grids):
+    """College and department title, every grid, then the signature block"""
+    columns = 1 + max((len(grid.days) for grid in grids), default=6)
+    writer = SheetWriter(ws, columns)
+
+    writer.banner("D.H.B. SONI COLLEGE, SOLAPUR", 'Timetable Title')
+    writer.banner(f"{department.name} Department", 'Timetable Department')
+    for index, grid in enumerate(grids):
+        if index:
+            writer.blank(2)
+        write_timetable(writer, grid)
+
+    writer.append(height=ROW_HEIGHT)
+    writer.blank()
+
+    pairs = [(1, 2), (3, 4), (5, 6)]
+    for values, style in [
+        (["___________________"] * 3, 'Signature Line'),
+        (["HOD", "Director", "Principal"], 'Signature Title'),
+        ([f"{department.name} Department", "D.H.B. Soni College", "D.H.B. Soni College"], 'Signature Detail'),
+    ]:
+        cells = []
+        for value in values:
+            cells += [writer.cell(value, style), None]
+        writer.append(cells, merge=pairs)
+
+    writer.blank()
+    writer.banner(f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}", 'Generated On')
+
+
+INVALID_TITLE_CHARS = re.compile(r'[\\/*?:\[\]]')
+
+def sheet_title(text, used):
+    """Valid, unique sheet title: no []:*?/\\ and at most 31 characters"""
+    base = INVALID_TITLE_CHARS.sub(' ', text).strip()[:31] or 'Sheet'
+    title, number = base, 2
+    while title.lower() in used:
+        suffix = f" ({number})"
+        title = base[:31 - len(suffix)] + suffix
+        number += 1
+    used.add(title.lower())
+    return title
+
+def write_workbook(fileobj, grids, sheet_per='semester'):
+    """
+    Saves every grid into one workbook in `fileobj`: a sheet per timetable
+    ('semester'), or a sheet per department with its semesters one below the
+    other ('department'). `grids` must be ordered by department.
+    """
+    wb = new_workbook()
+    used = set()
+
+    if sheet_per == 'department':
+        for _, department_grids in groupby(grids, key=lambda grid: grid.department.id):
+            department_grids = list(department_grids)
+            department = department_grids[0].department
+            write_sheet(wb.create_sheet(sheet_title(department.name, used)), department, department_grids)
+    else:
+        for grid in grids:
+            title = sheet_title(f"{grid.department.name} {grid.semester}", used)
+            write_sheet(wb.create_sheet(title), grid.department, [grid])
+
+    if not wb.worksheets:
+        wb.create_sheet('Timetable')
+    wb.save(fileobj)
+
+def render_excel(grid):
+    """Generate Excel timetable with proper formatting"""
+    wb = new_workbook()
+    write_sheet(wb.create_sheet(sheet_title(f"{grid.semester} Timetable", set())), grid.department, [grid])
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
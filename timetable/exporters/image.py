@@ -0,0 +1,292 @@
+# timetable/exporters/image.py
+"""
+PNG renderers for the share image and the downloadable timetable image.
+
+Both go through one engine, configured by an ImageLayout. The canvas height
+follows the timetable: each row is as tall as its fullest cell, so short
+timetables give small images and long ones are never cut off. The parts
+that are the same for every timetable (college title, day header row,
+signature block) are drawn once per process and pasted in, and text
+widths are measured once per (text, size).
+"""
+from datetime import datetime
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+from ..fonts import get_font
+from .encoding import DEFAULT_IMAGE_MODE, encode_image
+
+COLLEGE_TITLE = "D.H.B. SONI COLLEGE, SOLAPUR"
+COLLEGE_NAME = "D.H.B. Soni College"
+
+
+class ImageLayout:
+    """Geometry, fonts and colours of the downloadable timetable image"""
+    width = 1200
+    margin = 50
+    time_col_width = 200  # None: the time column is as wide as a day column
+    table_top = 180
+    header_height = 60
+    min_row_height = 100
+    cell_padding = 8
+
+    title_size, dept_size, sem_size = 32, 26, 22
+    header_size = 18
+    cell_size = 14
+    small_size = 11
+
+    title_color = (0, 0, 0)
+    dept_color = (124, 58, 237)  # Purple
+    sem_color = (16, 185, 129)   # Emerald
+    header_bg = (71, 85, 105)    # Slate-600 (matching web view)
+    header_text = (255, 255, 255)
+    time_bg = (248, 250, 252)    # Slate-50
+    cell_bg = (255, 255, 255)
+    lab_bg = (239, 246, 255)     # Light blue for lab sessions
+    lab_color = (0, 51, 153)     # Dark blue for lab text
+    text_color = (0, 0, 0)
+    faculty_color = (0, 0, 0)
+    break_color = (100, 100, 100)
+    empty_color = (156, 163, 175)
+    grid_color = (0, 0, 0)
+
+    outer_border_width = 5
+    header_border_width = 4
+    grid_line_width = 3
+
+    signatures = True
+    share_hint = False
+    generated_on = True
+
+
+class ShareImageLayout(ImageLayout):
+    """Compact, full-bleed variant for sharing"""
+    margin = 0
+    time_col_width = None
+    min_row_height = 60
+    cell_padding = 10
+
+    title_size, dept_size, sem_size = 36, 24, 16
+    header_size = 16
+    cell_size = 12
+    small_size = 12
+
+    title_color = (0, 0, 0)
+    time_bg = (248, 250, 252)
+    text_color = (31, 41, 55)    # Dark gray
+    faculty_color = (31, 41, 55)
+    break_color = (31, 41, 55)
+    grid_color = (209, 213, 219)  # Gray
+
+    outer_border_width = 0
+    header_border_width = 2
+    grid_line_width = 1
+
+    signatures = False
+    share_hint = True
+    generated_on = False
+
+
+# Measurements -------------------------------------------------------------
+
+@lru_cache(maxsize=4096)
+def text_width(text, size):
+    return get_font(size).getlength(text)
+
+@lru_cache(maxsize=4096)
+def fit_text(text, size, max_width):
+    """`text`, shortened with '...' if needed to fit into `max_width` pixels"""
+    if text_width(text, size) <= max_width:
+        return text
+    while text and text_width(text + "...", size) > max_width:
+        text = text[:-1]
+    return text + "..."
+
+def line_height(size):
+    return size + size // 2 + 2
+
+def draw_centered(draw, text, size, center_x, y, fill):
+    draw.text((center_x - text_width(text, size) / 2, y), text, fill=fill, font=get_font(size))
+
+
+# Static chrome, drawn once per process ------------------------------------
+
+def column_edges(layout, days):
+    """x positions of every column border, from the left edge of the table"""
+    table_width = layout.width - 2 * layout.margin
+    if layout.time_col_width is None:
+        time_col = day_col = table_width // (len(days) + 1)
+    else:
+        time_col = layout.time_col_width
+        day_col = (table_width - time_col) // len(days)
+    edges = [layout.margin, layout.margin + time_col]
+    for _ in days:
+        edges.append(edges[-1] + day_col)
+    return edges
+
+@lru_cache(maxsize=None)
+def title_layer(layout):
+    image = Image.new('RGB', (layout.width, layout.table_top), 'white')
+    draw = ImageDraw.Draw(image)
+    draw_centered(draw, COLLEGE_TITLE, layout.title_size, layout.width / 2, 30, layout.title_color)
+    return image
+
+@lru_cache(maxsize=None)
+def header_row_layer(layout, days):
+    edges = column_edges(layout, days)
+    image = Image.new('RGB', (layout.width, layout.header_height), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([edges[0], 0, edges[-1], layout.header_height], fill=layout.header_bg)
+
+    text_y = layout.header_height // 2 - 10
+    for (left, right), label in zip(zip(edges, edges[1:]), ('Time Slot',) + days):
+        draw_centered(draw, label, layout.header_size, (left + right) / 2, text_y, layout.header_text)
+    return image
+
+SIGNATURE_HEIGHT = 150
+
+@lru_cache(maxsize=None)
+def signature_layer(layout):
+    """Signature lines and titles; the HOD's department is added per render"""
+    image = Image.new('RGB', (layout.width, SIGNATURE_HEIGHT), 'white')
+    draw = ImageDraw.Draw(image)
+    spacing = (layout.width - 300) // 3
+    for index, (title, subtitle) in enumerate([
+        ("Head of Department", None),
+        ("Director", COLLEGE_NAME),
+        ("Principal", COLLEGE_NAME),
+    ]):
+        x = 150 + index * spacing
+        draw.line([x, 60, x + 200, 60], fill=(100, 100, 100), width=2)
+        draw_centered(draw, title, 16, x + 100, 75, (80, 80, 80))
+        if subtitle:
+            draw_centered(draw, subtitle, 12, x + 100, 100, (120, 120, 120))
+    return image
+
+
+# Per-timetable content ----------------------------------------------------
+
+def cell_lines(layout, cell, width):
+    """(text, size, colour) for every line drawn in `cell`"""
+    max_width = width - 2 * layout.cell_padding
+    if not cell:
+        return []
+    if cell.is_lab:
+        lines = [
+            ("LAB SESSION", layout.small_size, layout.lab_color),
+            (fit_text(cell.subject, layout.cell_size, max_width), layout.cell_size, layout.text_color),
+        ]
+        for faculty in cell.faculties:
+            lines.append((fit_text(f"({faculty})", layout.small_size, max_width), layout.small_size, layout.faculty_color))
+        return lines
+
+    lines = []
+    for entry in cell:
+        lines.append((fit_text(entry.subject, layout.cell_size, max_width), layout.cell_size, layout.text_color))
+        if entry.faculty:
+            lines.append((fit_text(f"({entry.faculty.name})", layout.small_size, max_width),
+                          layout.small_size, layout.faculty_color))
+        else:
+            lines.append(("(Break)", layout.small_size, layout.break_color))
+    return lines
+
+def draw_timetable_image(grid, layout):
+    department = grid.department
+    days = tuple(grid.days)
+    edges = column_edges(layout, days)
+
+    # Lay out every row first so the canvas can be sized to fit
+    rows = []
+    for row in grid.rows:
+        cells = [
+            (cell, cell_lines(layout, cell, right - left))
+            for cell, left, right in zip(row.cells, edges[1:], edges[2:])
+        ]
+        content_height = max(sum(line_height(size) for _, size, _ in lines) for _, lines in cells)
+        rows.append((row, cells, max(layout.min_row_height, content_height + 2 * layout.cell_padding)))
+
+    header_top = layout.table_top
+    body_top = header_top + layout.header_height
+    table_bottom = body_top + sum(height for _, _, height in rows)
+
+    footer_top = table_bottom
+    if layout.signatures:
+        footer_top += SIGNATURE_HEIGHT
+    footer_height = 60 if layout.generated_on else 30
+    if layout.share_hint:
+        footer_height += 30
+    img_height = footer_top + footer_height + 40
+
+    image = Image.new('RGB', (layout.width, img_height), 'white')
+    image.paste(title_layer(layout), (0, 0))
+    image.paste(header_row_layer(layout, days), (0, header_top))
+    if layout.signatures:
+        image.paste(signature_layer(layout), (0, table_bottom))
+    draw = ImageDraw.Draw(image)
+
+    center = layout.width / 2
+    draw_centered(draw, f"{department.name} Department", layout.dept_size, center, 80, layout.dept_color)
+    draw_centered(draw, f"{grid.semester} Timetable", layout.sem_size, center, 120, layout.sem_color)
+
+    # Rows
+    y = body_top
+    for row, cells, height in rows:
+        draw.rectangle([edges[0], y, edges[1], y + height], fill=layout.time_bg)
+        draw_centered(draw, row.label, layout.cell_size, (edges[0] + edges[1]) / 2,
+                      y + height // 2 - 10, layout.text_color)
+
+        for (cell, lines), left, right in zip(cells, edges[1:], edges[2:]):
+            draw.rectangle([left, y, right, y + height],
+                           fill=layout.lab_bg if cell.is_lab else layout.cell_bg)
+            cell_center = (left + right) / 2
+            if not lines:
+                draw_centered(draw, "-", layout.cell_size, cell_center, y + height // 2 - 10, layout.empty_color)
+                continue
+            line_y = y + layout.cell_padding
+            for text, size, color in lines:
+                draw_centered(draw, text, size, cell_center, line_y, color)
+                line_y += line_height(size)
+        y += height
+
+    # Grid lines on top of the cells
+    for x in edges[1:-1]:
+        draw.line([x, header_top, x, table_bottom], fill=layout.grid_color, width=layout.grid_line_width)
+    draw.line([edges[0], body_top, edges[-1], body_top], fill=layout.grid_color, width=layout.header_border_width)
+    y = body_top
+    for _, _, height in rows:
+        y += height
+        draw.line([edges[0], y, edges[-1], y], fill=layout.grid_color, width=layout.grid_line_width)
+    if layout.outer_border_width:
+        border = layout.outer_border_width
+        draw.rectangle([edges[0] - border, header_top - border, edges[-1] + border, table_bottom + border],
+                       outline=layout.grid_color, width=border)
+
+    # Footer
+    if layout.signatures:
+        draw_centered(draw, f"{department.name} Department", 12, 250, table_bottom + 100, (120, 120, 120))
+
+    footer_y = footer_top + 30
+    if layout.generated_on:
+        footer_text = f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}"
+        draw_centered(draw, footer_text, layout.small_size, center, footer_y, (150, 150, 150))
+    if layout.share_hint:
+        draw_centered(draw, "Scan QR code or visit URL to view full timetable",
+                      layout.small_size, center, img_height - 70, (59, 130, 246))
+
+    bottom_text = f"{department.name} - {grid.semester} | D.H.B. Soni College, Solapur"
+    draw_centered(draw, bottom_text, layout.small_size, center, img_height - 40, (107, 114, 128))
+
+    return image
+
+
+def render_timetable_image(grid, layout, mode=DEFAULT_IMAGE_MODE, level=None):
+    return encode_image(draw_timetable_image(grid, layout), mode, level)
+
+def render_share_image(grid, mode=DEFAULT_IMAGE_MODE, level=None):
+    """Generate timetable as an image for sharing"""
+    return render_timetable_image(grid, ShareImageLayout, mode, level)
+
+def render_image(grid, mode=DEFAULT_IMAGE_MODE, level=None):
+    """Timetable as an image file with proper tabular format and lab session display"""
+    return render_timetable_image(grid, ImageLayout, mode, level)
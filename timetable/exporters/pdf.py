@@ -0,0 +1,333 @@
+# timetable/exporters/pdf.py
+"""
+ReportLab PDF export.
+
+Paragraph and table styles never change, so they are built once per process
+(the sample stylesheet included) and shared by every render; the page layout
+lives in TimetableDocTemplate. If the full layout cannot be built the simple
+canvas layout is used instead; every such fallback is logged with its cause
+and counted (see pdf_render_stats()).
+"""
+import io
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib import colors
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = landscape(A4)
+COL_WIDTHS = [120] + [115] * 6
+
+
+# Process-wide styles ------------------------------------------------------
+
+class PDFStyles:
+    """Every paragraph and table style used by render_pdf()"""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+
+        self.title = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#000000'),
+            alignment=TA_CENTER,
+            spaceAfter=6
+        )
+        self.dept = ParagraphStyle(
+            'DeptStyle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#7c3aed'),
+            alignment=TA_CENTER,
+            spaceAfter=4
+        )
+        self.semester = ParagraphStyle(
+            'SemesterStyle',
+            parent=styles['Heading3'],
+            fontSize=12,
+            textColor=colors.HexColor('#10b981'),
+            alignment=TA_CENTER,
+            spaceAfter=15
+        )
+        self.cell = ParagraphStyle(
+            'CellStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            leading=9,
+            spaceAfter=2
+        )
+        self.signature = ParagraphStyle(
+            'SignatureStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_CENTER,
+            spaceBefore=30
+        )
+        self.footer = ParagraphStyle(
+            'FooterStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.gray,
+            alignment=TA_CENTER,
+            spaceBefore=20
+        )
+
+        self.table = TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#475569')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('TOPPADDING', (0, 0), (-1, 0), 8),
+
+            # Time column style
+            ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#f8f9fa')),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+            ('VALIGN', (0, 1), (0, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 1), (0, -1), 9),
+
+            # Grid lines
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+            ('VALIGN', (1, 1), (-1, -1), 'MIDDLE'),
+
+            # Cell padding
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+
+            # Row banding
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+        ])
+        self.signature_table = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTSIZE', (0, 1), (-1, 1), 12),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ])
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    return PDFStyles()
+
+
+class TimetableDocTemplate(BaseDocTemplate):
+    """Landscape A4 with one full-page frame, the layout of every timetable PDF"""
+
+    def __init__(self, buffer, **kwargs):
+        super().__init__(buffer, pagesize=PAGE_SIZE,
+                         rightMargin=20, leftMargin=20,
+                         topMargin=40, bottomMargin=40, **kwargs)
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        self.addPageTemplates([PageTemplate(id='Timetable', frames=[frame])])
+
+
+# Fallback instrumentation -------------------------------------------------
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+def _count(*keys):
+    with _stats_lock:
+        _stats.update(keys)
+
+def pdf_render_stats():
+    """
+    Renders and fallbacks in this process so far, e.g.
+    {'renders': 120, 'fallbacks': 2, 'fallback:LayoutError': 2}
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+# Rendering ----------------------------------------------------------------
+
+def _cell_paragraph(cell, style):
+    # Subjects and names are user input; escape them for Paragraph markup
+    if cell.is_lab:
+        # Lab session - show subject once, then all teachers
+        lines = [escape(line) for line in cell.lines()]
+        content = f"<b>{lines[0]}</b><br/>" + "<br/>".join(lines[1:])
+    else:
+        content = "<br/>".join(
+            f"<b>{escape(entry.subject)}</b><br/>{escape(entry.faculty.name) if entry.faculty else 'Break'}"
+            for entry in cell
+        )
+    return Paragraph(content, style)
+
+def build_story(grid, styles):
+    department_name = escape(grid.department.name)
+
+    elements = [
+        Paragraph("D.H.B. SONI COLLEGE, SOLAPUR", styles.title),
+        Paragraph(f"{department_name} Department", styles.dept),
+        Paragraph(f"{escape(grid.semester)} Timetable", styles.semester),
+    ]
+
+    data = [['Time Slot'] + grid.days]
+    for timetable_row in grid.rows:
+        data.append([timetable_row.label] + [
+            _cell_paragraph(cell, styles.cell) if cell else "-"
+            for cell in timetable_row.cells
+        ])
+
+    table = Table(data, colWidths=COL_WIDTHS, repeatRows=1)
+    table.setStyle(styles.table)
+    elements.append(table)
+    elements.append(Spacer(1, 20))
+
+    signature_table = Table([
+        [Paragraph(f"HOD<br/><small>{department_name} Department</small>", styles.signature),
+         Paragraph("Director<br/><small>D.H.B. Soni College</small>", styles.signature),
+         Paragraph("Principal<br/><small>D.H.B. Soni College</small>", styles.signature)],
+        ["___________________", "___________________", "___________________"],
+    ], colWidths=[250, 250, 250])
+    signature_table.setStyle(styles.signature_table)
+    elements.append(signature_table)
+
+    elements.append(Paragraph(
+        f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}",
+        styles.footer
+    ))
+    return elements
+
+def render_pdf(grid):
+    """Generate PDF timetable with proper lab session formatting"""
+    _count('renders')
+    buffer = io.BytesIO()
+    try:
+        TimetableDocTemplate(buffer).build(build_story(grid, pdf_styles()))
+    except Exception as e:
+        _count('fallbacks', f'fallback:{type(e).__name__}')
+        stats = pdf_render_stats()
+        logger.warning(
+            "PDF for %s - %s fell back to the simple layout (%s: %s); "
+            "%d of %d renders in this process fell back",
+            grid.department.name, grid.semester, type(e).__name__, e,
+            stats['fallbacks'], stats['renders'],
+            exc_info=True,
+        )
+        return render_simple_pdf(grid)
+
+    return buffer.getvalue()
+
+def render_simple_pdf(grid):
+    """Fallback PDF creation if main method fails"""
+    department = grid.department
+    selected_semester = grid.semester
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    width, height = landscape(A4)
+
+    # Title
+    c.setFont("Helvetica-Bold", 16)
+    c.drawCentredString(width/2, height-50, "D.H.B. SONI COLLEGE, SOLAPUR")
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width/2, height-80, f"{department.name} Department")
+
+    c.setFont("Helvetica", 12)
+    c.drawCentredString(width/2, height-100, f"{selected_semester} Timetable")
+
+    # Table header
+    c.setFont("Helvetica-Bold", 10)
+    days = grid.days
+
+    # Calculate column positions
+    col_width = (width - 100) / 7
+    x_positions = [40 + i * col_width for i in range(7)]
+
+    # Draw headers
+    headers = ['Time'] + days
+    for i, header in enumerate(headers):
+        c.drawString(x_positions[i] + 5, height-140, header[:10])
+
+    # Draw table grid
+    c.setStrokeColor(colors.black)
+
+    # Horizontal lines
+    for i in range(13):  # 12 rows max
+        y = height - 150 - (i * 40)
+        if y > 100:
+            c.line(40, y, width-40, y)
+
+    # Vertical lines
+    for x in x_positions + [width-40]:
+        c.line(x, height-150, x, max(100, height-150 - (12*40)))
+
+    # Add data
+    if grid:
+        c.setFont("Helvetica", 8)
+        row_height = 35
+        current_y = height - 165
+
+        for idx, row in enumerate(grid.rows):
+            if idx >= 12:  # Max 12 time slots
+                break
+
+            time_slot = f"{row.start_time.strftime('%I:%M')}-\n{row.end_time.strftime('%I:%M %p')}"
+
+            # Draw time in first column
+            c.drawString(x_positions[0] + 10, current_y, time_slot)
+
+            # Draw entries for each day
+            for day_idx, cell in enumerate(row.cells):
+                text = ""
+                for entry in cell:
+                    subject = entry.subject[:15] + "..." if len(entry.subject) > 15 else entry.subject
+                    faculty = entry.faculty.name[:10] if entry.faculty else "Break"
+                    text += f"{subject}\n({faculty})\n"
+
+                if text:
+                    y = current_y
+                    for line in text.split('\n'):
+                        if line:
+                            c.drawString(x_positions[day_idx+1] + 5, y, line)
+                            y -= 10
+
+            current_y -= row_height
+
+    # Add signature section
+    c.setFont("Helvetica", 10)
+    c.drawString(80, 80, "___________________")
+    c.drawString(80, 65, "HOD")
+    c.drawString(80, 50, f"{department.name} Department")
+
+    c.drawString(width/2 - 50, 80, "___________________")
+    c.drawString(width/2 - 50, 65, "Director")
+    c.drawString(width/2 - 50, 50, "D.H.B. Soni College")
+
+    c.drawString(width - 180, 80, "___________________")
+    c.drawString(width - 180, 65, "Principal")
+    c.drawString(width - 180, 50, "D.H.B. Soni College")
+
+    # Add generation date
+    c.setFont("Helvetica", 8)
+    c.drawString(width - 200, 30, f"Generated: {datetime.now().strftime('%d/%m/%Y %I:%M %p')}")
+
+    c.showPage()
+    c.save()
+
+    return buffer.getvalue()
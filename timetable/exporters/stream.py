@@ -0,0 +1,117 @@
+# timetable/exporters/stream.py
+"""
+College-wide dumps of every department, semester and archived year.
+
+Unlike the per-timetable exporters these are generators over the database:
+rows are read with QuerySet.iterator() and written out one at a time, so a
+full dump streams in constant memory and the header goes out before the
+first query has even run.
+"""
+import csv
+import json
+from datetime import datetime
+
+from ..models import TimetableEntry, TimetableHistory
+
+COLLEGE_NAME = 'D.H.B. SONI COLLEGE, SOLAPUR'
+CHUNK_SIZE = 2000
+
+CSV_HEADER = ['Source', 'Department', 'Semester', 'Year', 'Day',
+              'Start Time', 'End Time', 'Subject', 'Faculty']
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the generator"""
+    def write(self, value):
+        return value
+
+
+def current_entries():
+    # department_id/semester/start_time matches entry_dept_sem_slot_idx, so
+    # SQLite walks the index instead of sorting the whole table first
+    return (
+        TimetableEntry.objects
+        .select_related('department', 'faculty')
+        .order_by('department_id', 'semester', 'start_time', 'end_time', 'id')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+def archived_records():
+    # Only the entries are dumped; the packed matrix is never read
+    return (
+        TimetableHistory.objects
+        .select_related('department', 'snapshot')
+        .defer('snapshot__matrix_data')
+        .order_by('department_id', '-year', '-created_at')
+        .iterator(chunk_size=100)
+    )
+
+def _entry_fields(entry):
+    return {
+        'subject': entry.subject,
+        'faculty': entry.faculty.name if entry.faculty else None,
+        'day': entry.day,
+        'start_time': entry.start_time.strftime('%I:%M %p'),
+        'end_time': entry.end_time.strftime('%I:%M %p'),
+    }
+
+def stream_csv():
+    """Yields the college-wide CSV dump line by line"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for entry in current_entries():
+        fields = _entry_fields(entry)
+        yield writer.writerow([
+            'Current', entry.department.name, entry.semester, '',
+            fields['day'], fields['start_time'], fields['end_time'],
+            fields['subject'], fields['faculty'] or 'Break/Recess',
+        ])
+
+    for record in archived_records():
+        for item in record.entries:
+            yield writer.writerow([
+                'Archive', record.department.name, record.semester, record.year,
+                item['day'], item['start_time'], item['end_time'],
+                item['subject'], item['faculty'],
+            ])
+
+def stream_json():
+    """
+    Yields the college-wide JSON dump in small chunks. Current timetables are
+    grouped per department/semester as the ordered rows come in, so no group
+    is ever held in memory.
+    """
+    yield '{\n'
+    yield f'  "college": {json.dumps(COLLEGE_NAME)},\n'
+    yield f'  "generated_at": {json.dumps(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))},\n'
+    yield '  "timetables": ['
+
+    current = None
+    for entry in current_entries():
+        key = (entry.department_id, entry.semester)
+        if key != current:
+            if current is not None:
+                yield '\n    ]},'
+            header = json.dumps({'department': entry.department.name, 'semester': entry.semester})
+            yield f'\n    {header[:-1]}, "entries": ['
+            current = key
+            separator = '\n      '
+        yield separator + json.dumps(_entry_fields(entry))
+        separator = ',\n      '
+    if current is not None:
+        yield '\n    ]}'
+
+    yield '\n  ],\n  "archives": ['
+    separator = '\n    '
+    for record in archived_records():
+        yield separator + json.dumps({
+            'id': record.id,
+            'department': record.department.name,
+            'semester': record.semester,
+            'year': record.year,
+            'created_at': record.created_at,
+            'entries': record.entries,
+        }, default=str)
+        separator = ',\n    '
+    yield '\n  ]\n}\n'
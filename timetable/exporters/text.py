@@ -0,0 +1,100 @@
+# timetable/exporters/text.py
+import io
+import csv
+import json
+from datetime import datetime
+
+
+def render_csv(grid):
+    """Generate CSV timetable with proper formatting"""
+    department = grid.department
+    selected_semester = grid.semester
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Write headers
+    writer.writerow(['D.H.B. SONI COLLEGE, SOLAPUR'])
+    writer.writerow([f'{department.name} Department'])
+    writer.writerow([f'{selected_semester} Timetable'])
+    writer.writerow([])
+
+    # Table header
+    writer.writerow(['Time Slot'] + grid.days)
+
+    # Write data rows, with a literal "\n" between the lines of a cell
+    for row in grid.rows:
+        row_data = [row.label]
+        for cell in row.cells:
+            row_data.append("\\n".join(cell.lines()) if cell else "-")
+        writer.writerow(row_data)
+
+    # Add empty rows
+    writer.writerow([])
+    writer.writerow([])
+
+    # Add signature section
+    writer.writerow(["", "", ""])
+    writer.writerow(["___________________", "___________________", "___________________"])
+    writer.writerow(["HOD", "Director", "Principal"])
+    writer.writerow([f"{department.name} Department", "D.H.B. Soni College", "D.H.B. Soni College"])
+    writer.writerow([])
+
+    # Add generation date
+    writer.writerow([f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}"])
+
+    return buffer.getvalue().encode('utf-8')
+
+def render_faculty_csv(grid):
+    """One teacher's week (a FacultyTimetableGrid) as CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(['D.H.B. SONI COLLEGE, SOLAPUR'])
+    writer.writerow([f'{grid.faculty.name} - Weekly Timetable'])
+    writer.writerow([])
+
+    writer.writerow(['Time Slot'] + grid.days)
+    for row in grid.view_matrix():
+        writer.writerow([row['time']] + [
+            "\\n".join(
+                f"{session['subject']}{' (Lab)' if session['is_lab'] else ''}"
+                f" - {session['department']} {session['semester']}"
+                for session in sessions
+            ) or "-"
+            for sessions in row['data']
+        ])
+
+    writer.writerow([])
+    writer.writerow([f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}"])
+
+    return buffer.getvalue().encode('utf-8')
+
+def render_json(grid):
+    """Generate JSON timetable for a specific department and semester"""
+    data = {
+        'college': 'D.H.B. SONI COLLEGE, SOLAPUR',
+        'department': grid.department.name,
+        'semester': grid.semester,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'timetable': {}
+    }
+
+    # Build timetable structure
+    for row in grid.rows:
+        time_slot = f"{row.start_time.strftime('%H:%M')}-{row.end_time.strftime('%H:%M')}"
+        data['timetable'][time_slot] = {}
+
+        for cell in row.cells:
+            data['timetable'][time_slot][cell.day] = [
+                {
+                    'subject': entry.subject,
+                    'faculty': entry.faculty.name if entry.faculty else None,
+                    'faculty_id': entry.faculty.id if entry.faculty else None,
+                    'is_break': not entry.faculty,
+                    'entry_id': entry.id
+                }
+                for entry in cell
+            ]
+
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
@@ -0,0 +1,173 @@
+# timetable/exporters/word.py
+import io
+from datetime import datetime
+from docx import Document
+from docx.shared import Pt, RGBColor, Cm
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
+
+
+def _add_centered_paragraph(cell, text, bold=False, italic=False, color=None):
+    para = cell.add_paragraph()
+    run = para.add_run(text)
+    if bold:
+        run.font.bold = True
+    if italic:
+        run.font.italic = True
+    if color is not None:
+        run.font.color.rgb = color
+    para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    return para
+
+def render_word(grid):
+    """Generate Word document with proper formatting"""
+    department = grid.department
+    selected_semester = grid.semester
+    days = grid.days
+
+    # Create document
+    doc = Document()
+
+    # Set page margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Cm(1.27)
+        section.bottom_margin = Cm(1.27)
+        section.left_margin = Cm(1.27)
+        section.right_margin = Cm(1.27)
+
+    # Title
+    title = doc.add_paragraph('D.H.B. SONI COLLEGE, SOLAPUR')
+    title_run = title.runs[0]
+    title_run.font.size = Pt(16)
+    title_run.font.bold = True
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Department
+    dept = doc.add_paragraph()
+    dept_run = dept.add_run(f"{department.name} Department")
+    dept_run.font.size = Pt(14)
+    dept_run.font.bold = True
+    dept_run.font.color.rgb = RGBColor(0x7C, 0x3A, 0xED)
+    dept.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Semester
+    sem = doc.add_paragraph()
+    sem_run = sem.add_run(f"{selected_semester} Timetable")
+    sem_run.font.size = Pt(12)
+    sem_run.font.bold = True
+    sem_run.font.color.rgb = RGBColor(0x10, 0xB9, 0x81)
+    sem.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Space
+    doc.add_paragraph()
+
+    # Create table
+    num_rows = len(grid.rows) + 1
+    num_cols = len(days) + 1
+
+    table = doc.add_table(rows=num_rows, cols=num_cols)
+    table.style = 'Table Grid'
+    table.autofit = False
+    table.columns[0].width = Cm(3.5)
+    for i in range(1, num_cols):
+        table.columns[i].width = Cm(4.0)
+
+    # Header row
+    header_cells = table.rows[0].cells
+    header_cells[0].text = "Time Slot"
+    header_cells[0].paragraphs[0].runs[0].font.bold = True
+    header_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for i, day in enumerate(days, 1):
+        header_cells[i].text = day
+        header_cells[i].paragraphs[0].runs[0].font.bold = True
+        header_cells[i].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+        header_cells[i].vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+
+    # Fill data rows
+    for row_idx, row in enumerate(grid.rows, 1):
+        # Time cell
+        time_cell = table.rows[row_idx].cells[0]
+        time_cell.text = row.label
+        time_cell.paragraphs[0].runs[0].font.bold = True
+        time_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+        time_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+
+        # Day cells
+        for day_idx, timetable_cell in enumerate(row.cells, 1):
+            cell = table.rows[row_idx].cells[day_idx]
+
+            # Clear any existing content
+            cell.text = ""
+
+            if timetable_cell.is_lab:
+                # Lab session: subject line in blue, then one line per teacher
+                lines = timetable_cell.lines()
+                _add_centered_paragraph(cell, lines[0], bold=True,
+                                        color=RGBColor(0x25, 0x63, 0xEB))
+                for line in lines[1:]:
+                    _add_centered_paragraph(cell, line)
+            elif timetable_cell:
+                # Subject (bold) and faculty for every entry
+                lines = timetable_cell.lines()
+                for subject_text, faculty_text in zip(lines[::2], lines[1::2]):
+                    _add_centered_paragraph(cell, subject_text, bold=True)
+                    _add_centered_paragraph(cell, faculty_text)
+            else:
+                # Empty cell
+                _add_centered_paragraph(cell, "-", italic=True)
+
+            cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+
+    # Space after table
+    doc.add_paragraph()
+    doc.add_paragraph()
+
+    # SIGNATURE SECTION
+    sig_table = doc.add_table(rows=3, cols=3)
+    sig_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Set column widths for signatures
+    for col in sig_table.columns:
+        col.width = Cm(5.0)
+
+    # Fill signature table
+    signatures = [
+        ("HOD", f"{department.name} Department"),
+        ("Director", "D.H.B. Soni College"),
+        ("Principal", "D.H.B. Soni College")
+    ]
+
+    for i, (title_text, detail) in enumerate(signatures):
+        # Signature line (top row)
+        sig_cell = sig_table.rows[0].cells[i]
+        sig_cell.text = "___________________"
+        sig_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Title (middle row)
+        title_cell = sig_table.rows[1].cells[i]
+        title_cell.text = title_text
+        title_cell.paragraphs[0].runs[0].font.bold = True
+        title_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Detail (bottom row)
+        detail_cell = sig_table.rows[2].cells[i]
+        detail_cell.text = detail
+        detail_cell.paragraphs[0].runs[0].font.italic = True
+        detail_cell.paragraphs[0].runs[0].font.size = Pt(9)
+        detail_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Space before date
+    doc.add_paragraph()
+
+    # Generation date
+    date_para = doc.add_paragraph(f"Generated on: {datetime.now().strftime('%d/%m/%Y at %I:%M %p')}")
+    date_para.runs[0].font.italic = True
+    date_para.runs[0].font.size = Pt(9)
+    date_para.runs[0].font.color.rgb = RGBColor(0x66, 0x66, 0x66)
+    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,65 @@
+# timetable/fonts/__init__.py
+"""
+Font registry for the PIL image renderers.
+
+Font files are looked up once per process (at app startup) in
+settings.TIMETABLE_FONT_DIRS, then the usual system font folders, then this
+package, which bundles Bitstream Vera as a fallback so images never degrade
+to PIL's bitmap font. Loaded FreeTypeFont objects are kept per (face, size)
+for the life of the process.
+"""
+import os
+import sys
+from functools import lru_cache
+
+from django.conf import settings
+
+BUNDLED_FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Candidate files per face, in order of preference. Liberation Sans has the
+# same metrics as Arial, so layouts look the same on Linux servers.
+FONT_FACES = {
+    'regular': ['arial.ttf', 'LiberationSans-Regular.ttf', 'DejaVuSans.ttf', 'Vera.ttf'],
+}
+
+if sys.platform == 'win32':
+    SYSTEM_FONT_DIRS = [os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts')]
+elif sys.platform == 'darwin':
+    SYSTEM_FONT_DIRS = ['/Library/Fonts', '/System/Library/Fonts', os.path.expanduser('~/Library/Fonts')]
+else:
+    SYSTEM_FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts')]
+
+
+def font_dirs():
+    return [*getattr(settings, 'TIMETABLE_FONT_DIRS', []), *SYSTEM_FONT_DIRS, BUNDLED_FONT_DIR]
+
+@lru_cache(maxsize=None)
+def _font_files():
+    """Lower-cased file name -> path of every font file in font_dirs(), first one wins"""
+    files = {}
+    for directory in font_dirs():
+        for root, _dirs, names in os.walk(directory):
+            for name in names:
+                if name.lower().endswith(('.ttf', '.otf')):
+                    files.setdefault(name.lower(), os.path.join(root, name))
+    return files
+
+@lru_cache(maxsize=None)
+def font_path(face='regular'):
+    """Path of the preferred available file for `face`"""
+    files = _font_files()
+    for candidate in FONT_FACES[face]:
+        if candidate.lower() in files:
+            return files[candidate.lower()]
+    return os.path.join(BUNDLED_FONT_DIR, FONT_FACES[face][-1])
+
+def resolve_fonts():
+    """Resolve every face up front (called from TimetableConfig.ready)"""
+    for face in FONT_FACES:
+        font_path(face)
+
+@lru_cache(maxsize=None)
+def get_font(size, face='regular'):
+    """Shared FreeTypeFont for `face` at `size` points"""
+    from PIL import ImageFont  # PIL is only needed once something is drawn
+    return ImageFont.truetype(font_path(face), size)
@@ -1,5 +1,6 @@
 from django import forms
 from .models import TimetableEntry, Faculty
+from .semesters import college_semesters, semesters_for
 
 class TimetableForm(forms.ModelForm):
     lab_faculty = forms.ModelMultipleChoiceField(
@@ -60,6 +61,9 @@ class TimetableForm(forms.ModelForm):
         self.fields['faculty'].required = False
         self.fields['faculty'].label = "Theory Faculty (Single)"
         
+        # Offer the semesters departments actually run
+        self.fields['semester'].choices = [(semester, semester) for semester in college_semesters()]
+        
         # Set default semester to Semester 1
         if not self.instance.pk:  # Only for new entries
             self.fields['semester'].initial = 'Semester 1'
@@ -71,6 +75,11 @@ class TimetableForm(forms.ModelForm):
         faculty = cleaned_data.get('faculty')
         lab_faculty = cleaned_data.get('lab_faculty')
         day = cleaned_data.get('day')
+        department = cleaned_data.get('department')
+        semester = cleaned_data.get('semester')
+        
+        if department and semester and semester not in semesters_for(department.id):
+            self.add_error('semester', f'{department.name} does not run {semester}.')
         
         # Get is_lab from data (not cleaned_data since it's a hidden field)
         is_lab = self.data.get('is_lab', 'lecture')  # 'lab' or 'lecture'
@@ -0,0 +1,234 @@
+# timetable/grid.py
+from itertools import groupby
+
+from django.db.models import Exists, F, OuterRef
+
+from .models import TimetableEntry
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+
+def format_time_slot(start_time, end_time):
+    """Label used for a time slot row, e.g. '09:00 AM - 10:00 AM'"""
+    return f"{start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')}"
+
+
+def shared_slot_entries(prefix=''):
+    """
+    Other entries of the same timetable with the same subject in the same
+    slot as the outer query's entry (reached through `prefix`, e.g.
+    'timetableentry__'). Exists() of it marks the entry as part of a lab,
+    like TimetableCell.is_lab; entry_dept_sem_slot_idx answers it.
+    """
+    fields = ['department_id', 'semester', 'start_time', 'end_time', 'day', 'subject']
+    return TimetableEntry.objects.filter(
+        **{field: OuterRef(prefix + field) for field in fields}
+    ).exclude(id=OuterRef(prefix + 'id'))
+
+
+class TimetableCell:
+    """
+    Entries of one day in one time slot, plus the flags every renderer needs.
+
+    Several entries with the same subject are a lab session taught by more
+    than one teacher; an entry without a faculty is a break/recess.
+    """
+
+    def __init__(self, day, entries):
+        self.day = day
+        self.entries = entries
+        self.subject = entries[0].subject if entries else ''
+        self.faculties = [entry.faculty.name for entry in entries if entry.faculty]
+        self.ids = [entry.id for entry in entries]
+
+        subjects = {entry.subject for entry in entries}
+        self.is_lab = len(entries) > 1 and len(subjects) == 1
+        self.is_break = bool(entries) and all(entry.faculty is None for entry in entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def lines(self):
+        """
+        Plain text lines for the cell: '<subject> (Lab)' followed by every lab
+        teacher, otherwise subject and faculty (or 'Break') for each entry.
+        """
+        if self.is_lab:
+            return [f"{self.subject} (Lab)"] + (self.faculties or ["No teachers assigned"])
+
+        lines = []
+        for entry in self.entries:
+            lines.append(entry.subject)
+            lines.append(entry.faculty.name if entry.faculty else "Break")
+        return lines
+
+
+class TimetableRow:
+    """One time slot of the grid with a cell for each day"""
+
+    def __init__(self, start_time, end_time, cells):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.cells = cells
+
+    @property
+    def label(self):
+        return format_time_slot(self.start_time, self.end_time)
+
+
+class TimetableGrid:
+    """
+    All entries of one department/semester arranged by time slot and day.
+
+    The entries are fetched with a single query and every cell lookup after
+    that happens in memory, so building the matrix no longer costs one query
+    per day x time-slot cell. The page view and every exporter render from
+    this same structure.
+    """
+
+    def __init__(self, department, semester, entries, days=DAYS):
+        self.department = department
+        self.semester = semester
+        self.days = list(days)
+        self.entries = list(entries)
+
+        self._cells = {}
+        slots = set()
+        for entry in self.entries:
+            slot = (entry.start_time, entry.end_time)
+            slots.add(slot)
+            self._cells.setdefault((slot, entry.day), []).append(entry)
+
+        # Same order as the old values_list(...).distinct().order_by('start_time')
+        self.slots = sorted(slots)
+        self.rows = [
+            TimetableRow(start_time, end_time, [
+                TimetableCell(day, self._cells.get(((start_time, end_time), day), []))
+                for day in self.days
+            ])
+            for start_time, end_time in self.slots
+        ]
+
+    @classmethod
+    def for_semester(cls, department, semester):
+        entries = TimetableEntry.objects.filter(
+            department=department,
+            semester=semester
+        ).select_related('faculty').order_by('start_time', 'end_time', 'id')
+        return cls(department, semester, entries)
+
+    @classmethod
+    def for_college(cls, department=None):
+        """
+        A grid for every timetable that has entries (optionally of one
+        department), ordered by department name and semester, from one query.
+        """
+        entries = TimetableEntry.objects.select_related('department', 'faculty')
+        if department is not None:
+            entries = entries.filter(department=department)
+        entries = entries.order_by('department__name', 'department_id', 'semester', 'start_time', 'end_time', 'id')
+
+        grids = []
+        for (_, semester), group in groupby(entries, key=lambda entry: (entry.department_id, entry.semester)):
+            group = list(group)
+            grids.append(cls(group[0].department, semester, group))
+        return grids
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def view_matrix(self):
+        """
+        Rows for timetable_view.html. A lab session is collapsed into a single
+        dict that carries every teacher and every entry id (for deletion).
+        """
+        matrix = []
+        for row in self.rows:
+            day_data = []
+            for cell in row.cells:
+                if cell.is_lab:
+                    day_data.append([{
+                        'is_lab': True,
+                        'subject': cell.subject,
+                        'faculties': cell.faculties,
+                        'faculty': None,  # No single faculty
+                        'id': cell.ids[0],  # Use first entry ID for deletion
+                        'all_ids': cell.ids,  # All IDs for deletion
+                    }])
+                else:
+                    # Single entry, empty, or different subjects at the same time
+                    day_data.append(list(cell.entries))
+
+            matrix.append({
+                'time': row.label,
+                'data': day_data
+            })
+        return matrix
+
+
+class FacultyTimetableGrid(TimetableGrid):
+    """
+    One teacher's week: their entries in every department's active
+    semester, arranged by time slot and day like a department grid. Each
+    entry carries is_lab (the session is shared with other teachers).
+    """
+
+    def __init__(self, faculty, entries, days=DAYS):
+        self.faculty = faculty
+        super().__init__(None, None, entries, days)
+
+    @staticmethod
+    def week_entries(faculty):
+        # faculty leads entry_faculty_day_time_idx
+        return TimetableEntry.objects.filter(
+            faculty=faculty,
+            semester=F('department__active_semester'),
+        ).select_related('department').annotate(
+            is_lab=Exists(shared_slot_entries()),
+        ).order_by('start_time', 'end_time', 'department__name', 'id')
+
+    @classmethod
+    def for_faculty(cls, faculty):
+        return cls(faculty, cls.week_entries(faculty))
+
+    @staticmethod
+    def session(entry):
+        return {
+            'subject': entry.subject,
+            'department': entry.department.name,
+            'semester': entry.semester,
+            'is_lab': entry.is_lab,
+        }
+
+    def view_matrix(self):
+        """Rows for faculty_timetable.html: the sessions of every cell"""
+        return [
+            {'time': row.label, 'data': [[self.session(entry) for entry in cell] for cell in row.cells]}
+            for row in self.rows
+        ]
+
+    def schedule(self):
+        """The week as {day: [session, ...]} in time order, for the JSON API"""
+        week = {day: [] for day in self.days}
+        for entry in self.entries:
+            if entry.day in week:
+                week[entry.day].append(dict(
+                    self.session(entry),
+                    start_time=entry.start_time.strftime('%H:%M'),
+                    end_time=entry.end_time.strftime('%H:%M'),
+                ))
+        return week
+
+    @property
+    def total_minutes(self):
+        return sum(
+            (entry.end_time.hour * 60 + entry.end_time.minute)
+            - (entry.start_time.hour * 60 + entry.start_time.minute)
+            for entry in self.entries
+        )
@@ -0,0 +1,141 @@
+# timetable/jobs.py
+"""
+Background rendering of heavy exports (PDF, Word, images).
+
+The web worker runs the single timetable query and hands the grid to a local
+process pool, so CPU-bound rendering neither blocks the request nor competes
+for the GIL. Jobs and their files live in the database and MEDIA_ROOT; no
+external broker is needed. Finished renders also go into the exports cache
+under the timetable version, the same cache the direct downloads use, so an
+unchanged timetable is never rendered twice by either path.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.utils import timezone
+
+from .exporters import EXPORT_FORMATS, render_export
+from .exporters.cache import cache_export, get_cached_export
+from .grid import TimetableGrid
+from .models import ExportJob
+from .versions import get_timetable_version
+
+logger = logging.getLogger(__name__)
+
+# Shown on the job page; the exception itself only goes to the log
+EXPORT_FAILED = 'The export could not be rendered. Please try again.'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process pool shared by every request in this web worker"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'TIMETABLE_EXPORT_WORKERS', None),
+                # Fresh interpreters instead of forking a threaded web server;
+                # they only need the app registry to unpickle the grid
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+    return _executor
+
+def _discard_executor(executor):
+    # A worker died (e.g. killed for memory); later jobs need a fresh pool
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+def _store_result(job_id, content=None, failed=False):
+    job = ExportJob.objects.select_related('department').get(pk=job_id)
+    if failed:
+        job.status = ExportJob.FAILED
+        job.error = EXPORT_FAILED
+    else:
+        filename = EXPORT_FORMATS[job.format].filename(job.department, job.semester, job.options)
+        job.file.save(f'{job.pk}_{filename}', ContentFile(content), save=False)
+        job.status = ExportJob.DONE
+        cache_export(job.format, job.department, job.semester, job.version, job.options, content)
+    job.finished_at = timezone.now()
+    job.save()
+
+def _job_finished(job_id, executor, future):
+    # Runs on the pool's management thread (or the caller's, if the future is
+    # already done), so store the result on a thread with its own connection.
+    def store():
+        try:
+            try:
+                content = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _discard_executor(executor)
+                logger.exception('Export job %s failed', job_id)
+                _store_result(job_id, failed=True)
+            else:
+                _store_result(job_id, content)
+        finally:
+            connection.close()
+
+    threading.Thread(target=store, daemon=True).start()
+
+def _is_usable(job):
+    if job.status == ExportJob.DONE:
+        return bool(job.file) and job.file.storage.exists(job.file.name)
+    if job.status == ExportJob.PENDING:
+        # A job is lost if the worker process restarted before it finished
+        timeout = getattr(settings, 'TIMETABLE_EXPORT_JOB_TIMEOUT', 600)
+        return job.created_at > timezone.now() - timedelta(seconds=timeout)
+    return False
+
+def enqueue_export(department, semester, format_name, options=None):
+    """
+    Returns the export job for the timetable's current version and render
+    options, reusing a finished or still running one and starting a new
+    render otherwise. Returns None when that version is already in the
+    exports cache and can be served right away.
+    """
+    options = options or {}
+    version = get_timetable_version(department, semester).version
+    if get_cached_export(format_name, department, semester, version, options) is not None:
+        return None
+
+    job = ExportJob.objects.filter(
+        department=department, semester=semester,
+        format=format_name, version=version, options=options
+    ).exclude(status=ExportJob.FAILED).order_by('-created_at').first()
+
+    if job and _is_usable(job):
+        return job
+
+    job = ExportJob.objects.create(
+        department=department, semester=semester,
+        format=format_name, version=version, options=options
+    )
+    grid = TimetableGrid.for_semester(department, semester)
+    executor = get_executor()
+    future = executor.submit(render_export, format_name, grid, options)
+    future.add_done_callback(lambda f: _job_finished(job.pk, executor, f))
+    return job
+
+def run_export_job(job):
+    """Render a job in the current process (used by process_export_jobs)"""
+    grid = TimetableGrid.for_semester(job.department, job.semester)
+    try:
+        content = render_export(job.format, grid, job.options)
+    except Exception:
+        logger.exception('Export job %s failed', job.pk)
+        _store_result(job.pk, failed=True)
+    else:
+        _store_result(job.pk, content)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from timetable.models import ArchiveSnapshot
+from timetable.snapshots import build_matrix, pack
+
+
+class Command(BaseCommand):
+    help = "Build and store the history page matrix of archives that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Rebuild every stored matrix, not only the missing ones')
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        snapshots = ArchiveSnapshot.objects.only('id', 'data')
+        if not options['all']:
+            snapshots = snapshots.filter(matrix_data__isnull=True)
+
+        built = 0
+        for snapshot in snapshots.iterator(chunk_size=options['batch_size']):
+            ArchiveSnapshot.objects.filter(id=snapshot.id).update(
+                matrix_data=pack(build_matrix(snapshot.entries()))
+            )
+            built += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Stored the matrix of {built} archived timetable(s)."))
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from timetable.exporters.encoding import IMAGE_MODES, encode_image
+from timetable.exporters.image import ImageLayout, ShareImageLayout, draw_timetable_image
+from timetable.grid import TimetableGrid
+from timetable.models import Department, TimetableEntry
+
+
+class Command(BaseCommand):
+    help = "Compare encode time and file size of every image output mode and level."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', type=int, help='Department id (default: first timetable found)')
+        parser.add_argument('--semester', default=None)
+        parser.add_argument('--levels', default='1,6,9', help='Comma separated levels to try (0-9)')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['department']:
+            department = Department.objects.filter(id=options['department']).first()
+            semester = options['semester'] or 'Semester 1'
+        else:
+            entry = TimetableEntry.objects.select_related('department').first()
+            department = entry and entry.department
+            semester = options['semester'] or (entry and entry.semester)
+        if department is None:
+            raise CommandError('No timetable to benchmark; pass --department or add entries first.')
+
+        grid = TimetableGrid.for_semester(department, semester)
+        levels = [int(level) for level in options['levels'].split(',')]
+        repeat = max(options['repeat'], 1)
+
+        self.stdout.write(f"{department.name} - {semester}, {len(grid.rows)} time slots, best of {repeat}\n")
+        self.stdout.write(f"{'layout':<8} {'mode':<8} {'level':>5} {'encode ms':>10} {'bytes':>9}")
+        for layout_name, layout in [('image', ImageLayout), ('share', ShareImageLayout)]:
+            start = time.perf_counter()
+            image = draw_timetable_image(grid, layout)
+            draw_ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(f"{layout_name:<8} {'(draw)':<8} {'':>5} {draw_ms:>10.1f} {'':>9}")
+
+            for mode in IMAGE_MODES:
+                for level in levels:
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        content = encode_image(image, mode, level)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    self.stdout.write(
+                        f"{layout_name:<8} {mode:<8} {level:>5} {min(timings):>10.1f} {len(content):>9}"
+                    )
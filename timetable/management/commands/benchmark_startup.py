@@ -0,0 +1,88 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ['pandas', 'reportlab', 'openpyxl', 'docx', 'PIL']
+
+# Runs in a fresh interpreter: what a web worker does before its first request
+WORKER_SCRIPT = """
+import json, sys, time
+try:
+    import resource
+except ImportError:  # Windows; peak RSS is not measured there
+    resource = None
+
+start = time.perf_counter()
+import django
+django.setup()
+setup_ms = (time.perf_counter() - start) * 1000
+
+from django.urls import resolve
+for path in sys.argv[1:]:
+    resolve(path)
+total_ms = (time.perf_counter() - start) * 1000
+
+if {load_exporters}:
+    from importlib import import_module
+    from timetable.exporters import EXPORT_FORMATS
+    for export in EXPORT_FORMATS.values():
+        import_module('timetable.exporters.' + export.renderer.rsplit('.', 1)[0])
+
+rss_mb = None
+if resource is not None:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024  # bytes there, kilobytes everywhere else
+    rss_mb = rss_kb / 1024
+
+print(json.dumps({{
+    'setup_ms': setup_ms,
+    'total_ms': total_ms,
+    'rss_mb': rss_mb,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure django.setup() + URL resolution time and resident memory of a fresh worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters to start')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='URL to resolve after setup (repeatable, default: /timetable/)')
+        parser.add_argument('--load-exporters', action='store_true',
+                            help='Also import every export backend, to see what lazy loading saves')
+
+    def handle(self, *args, **options):
+        script = WORKER_SCRIPT.format(load_exporters=options['load_exporters'], heavy=HEAVY_MODULES)
+        paths = options['paths'] or ['/timetable/']
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+
+        samples = []
+        for _ in range(max(options['repeat'], 1)):
+            result = subprocess.run(
+                [sys.executable, '-c', script, *paths],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode:
+                raise CommandError(f"Worker failed to start:\n{result.stderr}")
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        def summary(key):
+            values = [sample[key] for sample in samples if sample[key] is not None]
+            if not values:
+                return "not available on this platform"
+            return f"min {min(values):7.1f}  median {statistics.median(values):7.1f}  max {max(values):7.1f}"
+
+        self.stdout.write(f"{len(samples)} fresh workers, resolving {', '.join(paths)}\n")
+        self.stdout.write(f"django.setup() ms   {summary('setup_ms')}")
+        self.stdout.write(f"setup + resolve ms  {summary('total_ms')}")
+        self.stdout.write(f"peak RSS MB         {summary('rss_mb')}")
+        self.stdout.write(f"heavy modules loaded: {', '.join(samples[-1]['loaded']) or 'none'}")
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from timetable.jobs import run_export_job
+from timetable.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Render export jobs that are still pending (e.g. after the web server "
+        "restarted mid-render) and optionally purge old finished jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge-days', type=int, default=None,
+            help='Delete finished/failed jobs (and their files) older than this many days.'
+        )
+
+    def handle(self, *args, **options):
+        pending = ExportJob.objects.filter(status=ExportJob.PENDING).select_related('department')
+        for job in pending:
+            run_export_job(job)
+            job.refresh_from_db()
+            self.stdout.write(f"{job}: {job.status}")
+
+        if options['purge_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['purge_days'])
+            old_jobs = ExportJob.objects.filter(created_at__lt=cutoff).exclude(status=ExportJob.PENDING)
+            count = 0
+            for job in old_jobs:
+                if job.file:
+                    job.file.delete(save=False)
+                job.delete()
+                count += 1
+            self.stdout.write(self.style.SUCCESS(f"Purged {count} old export jobs."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from timetable.models import ArchiveSnapshot
+from timetable.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over archived timetables."
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Archive search needs SQLite with FTS5.')
+
+        snapshots = ArchiveSnapshot.objects.only('id', 'data').iterator(chunk_size=100)
+        count = rebuild_index((snapshot.id, snapshot.entries()) for snapshot in snapshots)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} archived timetable(s)."))
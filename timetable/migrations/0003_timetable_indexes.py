@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0002_department_active_semester'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['department', 'semester', 'start_time', 'end_time', 'day'], name='entry_dept_sem_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetableentry',
+            index=models.Index(fields=['faculty', 'day', 'start_time', 'end_time'], name='entry_faculty_day_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetablehistory',
+            index=models.Index(fields=['department', 'year', 'created_at'], name='history_dept_year_created_idx'),
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:20
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, time
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Snapshot format 1 as timetable/snapshots.py wrote it when this migration
+# was made; frozen here so later format changes cannot alter the migration
+TIME_FORMAT = '%I:%M %p'
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+DAY_ORDER = {day: index for index, day in enumerate(DAYS)}
+
+
+def _minutes(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value, TIME_FORMAT).time()
+    return value.hour * 60 + value.minute
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def encode_snapshot(items):
+    rows = sorted(
+        (_minutes(item['start_time']), _minutes(item['end_time']),
+         DAY_ORDER.get(item['day'], len(DAY_ORDER)), item['day'],
+         item['subject'], item['faculty'] or '', item['faculty'])
+        for item in items
+    )
+
+    strings = {}
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    columns = {'subject': [], 'faculty': [], 'day': [], 'start': [], 'end': []}
+    for start, end, _, day, subject, _, faculty in rows:
+        columns['subject'].append(intern(subject))
+        columns['faculty'].append(intern(faculty))
+        columns['day'].append(intern(day))
+        columns['start'].append(start)
+        columns['end'].append(end)
+
+    payload = _dumps({'v': 1, 'strings': list(strings), **columns})
+    return hashlib.sha256(payload).hexdigest(), zlib.compress(payload, 9)
+
+def decode_snapshot(data):
+    payload = json.loads(zlib.decompress(bytes(data)))
+    strings = payload['strings']
+
+    def label(minutes):
+        return time(minutes // 60, minutes % 60).strftime(TIME_FORMAT)
+
+    return [
+        {
+            'subject': strings[subject],
+            'faculty': strings[faculty],
+            'day': strings[day],
+            'start_time': label(start),
+            'end_time': label(end),
+        }
+        for subject, faculty, day, start, end in zip(
+            payload['subject'], payload['faculty'], payload['day'], payload['start'], payload['end'],
+        )
+    ]
+
+
+def pack_snapshots(apps, schema_editor):
+    """Move every JSON data_snapshot into a shared, compressed ArchiveSnapshot"""
+    ArchiveSnapshot = apps.get_model('timetable', 'ArchiveSnapshot')
+    TimetableHistory = apps.get_model('timetable', 'TimetableHistory')
+
+    snapshot_ids = {}
+    for record in TimetableHistory.objects.only('id', 'data_snapshot').iterator(chunk_size=100):
+        digest, data = encode_snapshot(record.data_snapshot or [])
+        if digest not in snapshot_ids:
+            snapshot, _ = ArchiveSnapshot.objects.get_or_create(digest=digest, defaults={'data': data})
+            snapshot_ids[digest] = snapshot.id
+        TimetableHistory.objects.filter(id=record.id).update(
+            snapshot_id=snapshot_ids[digest], data_snapshot=None,
+        )
+
+def unpack_snapshots(apps, schema_editor):
+    ArchiveSnapshot = apps.get_model('timetable', 'ArchiveSnapshot')
+    TimetableHistory = apps.get_model('timetable', 'TimetableHistory')
+
+    for snapshot in ArchiveSnapshot.objects.iterator(chunk_size=100):
+        TimetableHistory.objects.filter(snapshot_id=snapshot.id).update(
+            data_snapshot=decode_snapshot(snapshot.data),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='timetablehistory',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archives', to='timetable.archivesnapshot'),
+        ),
+        migrations.AlterField(
+            model_name='timetablehistory',
+            name='data_snapshot',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(pack_snapshots, unpack_snapshots),
+        migrations.RemoveField(
+            model_name='timetablehistory',
+            name='data_snapshot',
+        ),
+        migrations.AlterField(
+            model_name='timetablehistory',
+            name='snapshot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archives', to='timetable.archivesnapshot'),
+        ),
+    ]
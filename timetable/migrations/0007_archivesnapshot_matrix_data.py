@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0006_archivesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivesnapshot',
+            name='matrix_data',
+            field=models.BinaryField(null=True),
+        ),
+    ]
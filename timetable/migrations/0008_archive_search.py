@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+import json
+import zlib
+
+from django.db import migrations
+
+
+# The index as timetable/search.py defined it when this migration was made,
+# and a reader for snapshot format 1; frozen here so later changes to either
+# module cannot alter the migration
+FTS_TABLE = 'timetable_archive_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "snapshot_id UNINDEXED, subject, faculty, days, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (snapshot_id, subject, faculty, days) VALUES (%s, %s, %s, %s)"
+
+
+def assignments(data):
+    """(subject, faculty, days) of every distinct subject/faculty pair of a snapshot"""
+    payload = json.loads(zlib.decompress(bytes(data)))
+    strings = payload['strings']
+    days = {}
+    for subject, faculty, day in zip(payload['subject'], payload['faculty'], payload['day']):
+        days.setdefault((strings[subject], strings[faculty] or ''), {})[strings[day]] = None
+    return [(subject, faculty, ' '.join(pair_days)) for (subject, faculty), pair_days in days.items()]
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    ArchiveSnapshot = apps.get_model('timetable', 'ArchiveSnapshot')
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        for snapshot in ArchiveSnapshot.objects.only('id', 'data').iterator(chunk_size=100):
+            for row in assignments(snapshot.data):
+                cursor.execute(INSERT_SQL, [snapshot.id, *row])
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0007_archivesnapshot_matrix_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_archive_years(apps, schema_editor):
+    ArchiveYear = apps.get_model('timetable', 'ArchiveYear')
+    TimetableHistory = apps.get_model('timetable', 'TimetableHistory')
+    ArchiveYear.objects.bulk_create(
+        ArchiveYear(department_id=row['department_id'], year=row['year'], archive_count=row['count'])
+        for row in TimetableHistory.objects.order_by().values('department_id', 'year').annotate(count=Count('id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0008_archive_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('archive_count', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='timetable.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('department', 'year'), name='unique_archive_year')],
+            },
+        ),
+        migrations.RunPython(count_archive_years, migrations.RunPython.noop),
+    ]
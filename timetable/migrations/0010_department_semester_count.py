@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+# The semester counts views used to hard-code by department name; every
+# other department keeps the default of six
+SEMESTER_COUNTS = {'MCA': 4, 'MCS': 4}
+
+
+def set_semester_counts(apps, schema_editor):
+    Department = apps.get_model('timetable', 'Department')
+    for name, count in SEMESTER_COUNTS.items():
+        Department.objects.filter(name=name).update(semester_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0009_archiveyear'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='semester_count',
+            field=models.PositiveSmallIntegerField(default=6, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)]),
+        ),
+        migrations.AlterField(
+            model_name='timetableentry',
+            name='semester',
+            field=models.CharField(choices=[('Semester 1', 'Semester 1'), ('Semester 2', 'Semester 2'), ('Semester 3', 'Semester 3'), ('Semester 4', 'Semester 4'), ('Semester 5', 'Semester 5'), ('Semester 6', 'Semester 6'), ('Semester 7', 'Semester 7'), ('Semester 8', 'Semester 8'), ('Semester 9', 'Semester 9'), ('Semester 10', 'Semester 10'), ('Semester 11', 'Semester 11'), ('Semester 12', 'Semester 12')], default='Semester 1', max_length=20),
+        ),
+        migrations.RunPython(set_semester_counts, migrations.RunPython.noop),
+    ]
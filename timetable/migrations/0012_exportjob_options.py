@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0011_faculty_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='options',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
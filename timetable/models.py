@@ -1,18 +1,39 @@
 # timetable/models.py
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils.functional import cached_property
+
+from .semesters import DEFAULT_SEMESTER_COUNT, MAX_SEMESTERS, SEMESTER_CHOICES
+from .snapshots import build_matrix, decode_snapshot, encode_snapshot, pack, unpack
 
 class Department(models.Model):
     name = models.CharField(max_length=100)
     # New Field: Track which semester is currently active for this department
     active_semester = models.CharField(max_length=20, default='Semester 1')
+    # Semesters 1..semester_count are offered (see semesters.py)
+    semester_count = models.PositiveSmallIntegerField(
+        default=DEFAULT_SEMESTER_COUNT,
+        validators=[MinValueValidator(1), MaxValueValidator(MAX_SEMESTERS)],
+    )
     
     def __str__(self):
         return self.name
 
+    @property
+    def year_count(self):
+        """Years of the programme, two semesters each; a last odd semester starts another year"""
+        return -(-self.semester_count // 2)
+
 class Faculty(models.Model):
     name = models.CharField(max_length=100)
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
+    # Login of the teacher, for their own "my timetable" view
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='faculty',
+    )
     
     def __str__(self):
         return self.name
@@ -27,14 +48,7 @@ class TimetableEntry(models.Model):
         ('Saturday', 'Saturday'),
     ]
     
-    SEMESTER_CHOICES = [
-        ('Semester 1', 'Semester 1'),
-        ('Semester 2', 'Semester 2'),
-        ('Semester 3', 'Semester 3'),
-        ('Semester 4', 'Semester 4'),
-        ('Semester 5', 'Semester 5'),
-        ('Semester 6', 'Semester 6'),
-    ]
+    SEMESTER_CHOICES = SEMESTER_CHOICES
     
     department = models.ForeignKey(Department, on_delete=models.CASCADE)
     faculty = models.ForeignKey(Faculty, on_delete=models.SET_NULL, null=True, blank=True)
@@ -46,6 +60,19 @@ class TimetableEntry(models.Model):
     
     class Meta:
         verbose_name_plural = "Timetable Entries"
+        indexes = [
+            # Timetable views/exports filter on (department, semester) and
+            # order by slot; cell/duplicate lookups add (day, start_time, end_time)
+            models.Index(
+                fields=['department', 'semester', 'start_time', 'end_time', 'day'],
+                name='entry_dept_sem_slot_idx',
+            ),
+            # Faculty conflict checks: faculty + day, then a time range
+            models.Index(
+                fields=['faculty', 'day', 'start_time', 'end_time'],
+                name='entry_faculty_day_time_idx',
+            ),
+        ]
     
     # timetable/models.py
 
@@ -78,16 +105,145 @@ def clean(self):
     def __str__(self):
         return f"{self.department.name} - {self.semester} - {self.subject}"
 
+class ArchiveSnapshot(models.Model):
+    """
+    The entries of an archived timetable, compressed (see snapshots.py),
+    with the matrix the history page shows already built from them.
+    Stored once per distinct content: archiving an unchanged timetable again
+    reuses the existing row.
+    """
+    digest = models.CharField(max_length=64, unique=True)  # sha256 of the encoded entries
+    data = models.BinaryField()
+    # Packed build_matrix(); NULL until backfill_archive_matrices has run
+    matrix_data = models.BinaryField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def store(cls, items):
+        """The snapshot holding these entry dicts, created if it is new"""
+        digest, data = encode_snapshot(items)
+        snapshot, _ = cls.objects.get_or_create(digest=digest, defaults={
+            'data': data,
+            'matrix_data': pack(build_matrix(decode_snapshot(data))),
+        })
+        return snapshot
+
+    def entries(self):
+        return decode_snapshot(self.data)
+
+    def matrix(self):
+        if self.matrix_data is None:
+            return build_matrix(self.entries())
+        return unpack(self.matrix_data)
+
+    def __str__(self):
+        return self.digest[:12]
+
 class TimetableHistory(models.Model):
     department = models.ForeignKey(Department, on_delete=models.CASCADE)
     semester = models.CharField(max_length=50)
     year = models.IntegerField()
-    data_snapshot = models.JSONField()
+    snapshot = models.ForeignKey(ArchiveSnapshot, on_delete=models.PROTECT, related_name='archives')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name_plural = "Timetable Histories"
         ordering = ['-year', '-created_at']
+        indexes = [
+            # department_history and archive_search
+            models.Index(
+                fields=['department', 'year', 'created_at'],
+                name='history_dept_year_created_idx',
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.department.name} - {self.semester} ({self.year})"
\ No newline at end of file
+        return f"{self.department.name} - {self.semester} ({self.year})"
+
+    @cached_property
+    def entries(self):
+        """The archived entry dicts: subject, faculty, day, start_time, end_time"""
+        return self.snapshot.entries()
+
+    @cached_property
+    def matrix(self):
+        """Time slot rows of the archived timetable, see build_matrix()"""
+        return self.snapshot.matrix()
+
+class ArchiveYear(models.Model):
+    """
+    How many archives a department has for a year, kept up to date by
+    signals as archives are created and deleted. Gives the distinct archive
+    years and per-department totals without scanning TimetableHistory.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    archive_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'year'], name='unique_archive_year'),
+        ]
+
+    @classmethod
+    def years(cls):
+        """Distinct archive years, newest first, as {'year': ...} rows"""
+        return cls.objects.values('year').distinct().order_by('-year')
+
+    def __str__(self):
+        return f"{self.department.name} {self.year} ({self.archive_count})"
+
+class TimetableVersion(models.Model):
+    """
+    Content version of one department/semester timetable. Bumped whenever an
+    entry in that timetable is created, changed or deleted, so anything
+    derived from the timetable can be keyed or validated by it cheaply.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    semester = models.CharField(max_length=20)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'semester'], name='unique_timetable_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.department.name} - {self.semester} (v{self.version})"
+
+
+class ExportJob(models.Model):
+    """A timetable export rendered in the background worker pool"""
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    semester = models.CharField(max_length=20)
+    format = models.CharField(max_length=20)
+    # TimetableVersion.version the file was rendered from
+    version = models.PositiveIntegerField()
+    # Render options of the format, e.g. {'mode': 'webp', 'level': 6} for images
+    options = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['department', 'semester', 'format', 'version'],
+                name='exportjob_timetable_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.department.name} - {self.semester} {self.format} ({self.status})"
@@ -0,0 +1,98 @@
+# timetable/pagination.py
+"""
+Keyset pagination for archive listings.
+
+Archives are listed newest first by (year, created_at, id). A page is
+addressed by the key of the row just before or after it (an opaque cursor
+in ?after= / ?before=) instead of an offset, so every page is one range
+scan of history_dept_year_created_idx however far back it is.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+PER_PAGE = 20
+
+
+def encode_cursor(record):
+    raw = f"{record.year}|{record.created_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(year, created_at, id), or None for a missing or malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        year, created_at, record_id = raw.split('|')
+        return int(year), datetime.fromisoformat(created_at), int(record_id)
+    except ValueError:
+        return None
+
+
+# The leading year bound is implied by the rest, but it is what lets SQLite
+# seek into the index instead of walking it from the newest year down
+
+def _older_than(key):
+    year, created_at, record_id = key
+    return Q(year__lte=year) & (
+        Q(year__lt=year)
+        | Q(year=year, created_at__lt=created_at)
+        | Q(year=year, created_at=created_at, id__lt=record_id)
+    )
+
+def _newer_than(key):
+    year, created_at, record_id = key
+    return Q(year__gte=year) & (
+        Q(year__gt=year)
+        | Q(year=year, created_at__gt=created_at)
+        | Q(year=year, created_at=created_at, id__gt=record_id)
+    )
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_previous, has_next):
+        self.object_list = object_list
+        self.has_previous = has_previous
+        self.has_next = has_next
+
+    @property
+    def previous_cursor(self):
+        return encode_cursor(self.object_list[0]) if self.has_previous else None
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def has_other_pages(self):
+        return self.has_previous or self.has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_page(queryset, after=None, before=None, per_page=PER_PAGE):
+    """
+    The page of `queryset` (TimetableHistory) right after the `after` cursor,
+    right before the `before` cursor, or the first page.
+    """
+    before_key = decode_cursor(before)
+    after_key = None if before_key else decode_cursor(after)
+
+    if before_key:
+        rows = list(
+            queryset.filter(_newer_than(before_key))
+            .order_by('year', 'created_at', 'id')[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1], has_previous, has_next=True)
+
+    if after_key:
+        queryset = queryset.filter(_older_than(after_key))
+    rows = list(queryset.order_by('-year', '-created_at', '-id')[:per_page + 1])
+    return KeysetPage(rows[:per_page], has_previous=after_key is not None, has_next=len(rows) > per_page)
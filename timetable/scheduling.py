@@ -0,0 +1,134 @@
+# timetable/scheduling.py
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from .availability import clear_availability
+from .conflicts import conflict_message, find_faculty_conflicts
+from .models import TimetableEntry
+from .stats import invalidate_dashboard_stats
+from .versions import bump_timetable_versions
+
+
+def _slot_label(day, start_time, end_time):
+    return f'{day} {start_time.strftime("%I:%M %p")} - {end_time.strftime("%I:%M %p")}'
+
+def _overlapping(slots):
+    """Pairs of overlapping (start_time, end_time) intervals in `slots`"""
+    pairs = []
+    latest = None
+    for start_time, end_time in sorted(slots):
+        if latest and start_time < latest[1]:
+            pairs.append((latest, (start_time, end_time)))
+        if latest is None or end_time > latest[1]:
+            latest = (start_time, end_time)
+    return pairs
+
+def _batch_overlaps(entries):
+    """
+    Errors for new entries that overlap each other: a teacher in two slots
+    at once, or two different slots of one timetable sharing time (several
+    teachers in the very same slot is a lab and fine).
+    """
+    by_faculty, by_timetable = {}, {}
+    for entry in entries:
+        interval = (entry.start_time, entry.end_time)
+        timetable = (entry.department, entry.semester, entry.day)
+        by_timetable.setdefault(timetable, set()).add(interval)
+        if entry.faculty is not None:
+            by_faculty.setdefault((entry.faculty, entry.day), []).append(interval)
+
+    errors = []
+    for (department, semester, day), intervals in by_timetable.items():
+        for first, second in _overlapping(intervals):
+            errors.append(
+                f'{_slot_label(day, *first)} and {_slot_label(day, *second)} overlap '
+                f'in {department.name} - {semester}.'
+            )
+    for (faculty, day), intervals in by_faculty.items():
+        for first, second in _overlapping(intervals):
+            errors.append(
+                f'{faculty.name} cannot teach {_slot_label(day, *first)} and '
+                f'{_slot_label(day, *second)} at the same time.'
+            )
+    return errors
+
+def create_entries(department, semester, subject, slots, faculties=(None,),
+                   is_lab=False, skip_occupied=False):
+    """
+    Creates `subject` in every (day, start_time, end_time) slot for every
+    faculty (None for breaks) with a single bulk INSERT inside a transaction.
+
+    Duplicates and faculty conflicts for the whole batch are checked up front
+    and reported together in one ValidationError; in that case nothing is
+    written. A slot that already has an entry is an error, unless it is a lab
+    (several teachers share the slot, but each teacher only once) or
+    `skip_occupied` is set, which silently leaves such slots alone (all-day
+    breaks). Only a lab may have more than one teacher, and the slots of one
+    batch may not overlap each other.
+    """
+    slots = list(dict.fromkeys(slots))
+    faculties = list(dict.fromkeys(faculties)) or [None]
+
+    errors = []
+    if not is_lab and len(faculties) > 1:
+        errors.append('Only a lab session can have more than one teacher.')
+    for day, start_time, end_time in slots:
+        if start_time >= end_time:
+            errors.append(f'{day}: end time must be after start time.')
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        # Every existing entry in any of the requested slots, in one query
+        in_slots = Q()
+        for day, start_time, end_time in slots:
+            in_slots |= Q(day=day, start_time=start_time, end_time=end_time)
+        occupied = {}
+        for entry in TimetableEntry.objects.filter(in_slots, department=department, semester=semester):
+            occupied.setdefault((entry.day, entry.start_time, entry.end_time), []).append(entry)
+
+        new_entries = []
+        free_slots = []
+        for slot in slots:
+            day, start_time, end_time = slot
+            existing = occupied.get(slot, [])
+            label = _slot_label(*slot)
+
+            if existing and skip_occupied:
+                continue
+            if existing and not is_lab:
+                errors.append(
+                    f'{label} is already occupied in {department.name} - {semester}. '
+                    'For multiple teachers, please select "Lab Session".'
+                )
+                continue
+            taken = {entry.faculty_id for entry in existing}
+            for faculty in faculties:
+                if faculty is not None and faculty.id in taken:
+                    errors.append(f'{faculty.name} is already assigned to {label}.')
+                    continue
+                new_entries.append(TimetableEntry(
+                    department=department, semester=semester, day=day,
+                    start_time=start_time, end_time=end_time,
+                    subject=subject, faculty=faculty
+                ))
+            free_slots.append(slot)
+
+        # The queries above only see rows that already exist
+        errors.extend(_batch_overlaps(new_entries))
+        conflicts = find_faculty_conflicts(
+            faculties, free_slots, current_dept=department, is_lab=is_lab
+        )
+        errors.extend(conflict_message(conflict) for conflict in conflicts)
+
+        if errors:
+            raise ValidationError(errors)
+
+        created = TimetableEntry.objects.bulk_create(new_entries)
+        # bulk_create() sends no post_save signals
+        if created:
+            bump_timetable_versions([(department.id, semester)])
+            invalidate_dashboard_stats()
+            clear_availability()
+        return created
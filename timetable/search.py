@@ -0,0 +1,163 @@
+# timetable/search.py
+"""
+Full-text search over the contents of archived timetables (SQLite FTS5).
+
+timetable_archive_fts has one row per teaching assignment of an archive:
+a subject, its faculty and the days it is taught, tagged with the
+ArchiveSnapshot id. All terms of a query must match the same assignment,
+so `faculty:"Prof A" subject:java` finds the archives where Prof A taught
+Java, not those where Prof A taught something and Java was on the
+timetable. Signals index a snapshot when it is created and drop it when it
+is deleted; `manage.py rebuild_archive_search` rebuilds the whole index.
+A search ranks assignments with bm25 and returns the archives that use the
+best matching snapshots, so nothing is decoded at query time.
+"""
+import re
+
+from django.db import connection as default_connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'timetable_archive_fts'
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "snapshot_id UNINDEXED, subject, faculty, days, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (snapshot_id, subject, faculty, days) VALUES (%s, %s, %s, %s)"
+# bm25 column weights: snapshot_id, subject, faculty, days
+WEIGHTS = (0.0, 4.0, 4.0, 1.0)
+
+FIELD_COLUMNS = {
+    'subject': 'subject',
+    'faculty': 'faculty',
+    'teacher': 'faculty',
+    'day': 'days',
+}
+TERM = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+# highlight() markers; escaped text never contains them
+MARK_START, MARK_END = '\x02', '\x03'
+MATCHES_SHOWN = 5
+
+
+def search_available(connection=default_connection):
+    return connection.vendor == 'sqlite'
+
+def assignments(entries):
+    """(subject, faculty, days) of every distinct subject/faculty pair in `entries`"""
+    days = {}
+    for entry in entries:
+        days.setdefault((entry['subject'], entry['faculty'] or ''), {})[entry['day']] = None
+    return [(subject, faculty, ' '.join(pair_days)) for (subject, faculty), pair_days in days.items()]
+
+
+# Maintenance --------------------------------------------------------------
+
+def _insert(cursor, snapshot_id, entries):
+    for row in assignments(entries):
+        cursor.execute(INSERT_SQL, [snapshot_id, *row])
+
+def index_snapshot(snapshot_id, entries, connection=default_connection):
+    """Adds a newly stored snapshot to the index"""
+    if not search_available(connection):
+        return
+    with connection.cursor() as cursor:
+        _insert(cursor, snapshot_id, entries)
+
+def unindex_snapshot(snapshot_id, connection=default_connection):
+    if not search_available(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE snapshot_id = %s", [snapshot_id])
+
+def rebuild_index(snapshots, connection=default_connection):
+    """
+    Replaces the whole index with `snapshots`, an iterable of
+    (snapshot id, entry dicts). Returns the number of snapshots indexed.
+    """
+    if not search_available(connection):
+        return 0
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        for snapshot_id, entries in snapshots:
+            _insert(cursor, snapshot_id, entries)
+            count += 1
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return count
+
+
+# Searching ----------------------------------------------------------------
+
+def fts_query(text):
+    """
+    FTS5 query for what the user typed. Every word or "quoted phrase" must
+    match; bare words also match as a prefix. subject:, faculty: (or
+    teacher:) and day: limit a term to that column, e.g.
+        faculty:"Prof A" subject:"data structures"
+    Only word characters reach FTS5, so any input gives a valid query.
+    """
+    terms = []
+    for field, phrase, word in TERM.findall(text):
+        column = FIELD_COLUMNS.get(field.lower())
+        tokens = re.findall(r'\w+', phrase or word)
+        if field and not column:
+            tokens = [field] + tokens  # "10:30" is a word, not a filter
+        if not tokens:
+            continue
+        term = '"' + ' '.join(tokens) + '"'
+        if not phrase:
+            term += '*'
+        terms.append(f'{column} : {term}' if column else term)
+    return ' AND '.join(terms)
+
+def _highlighted(text):
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def search_archives(text, archives, limit=200):
+    """
+    The archives in `archives` (a TimetableHistory queryset) whose contents
+    match `text`, best match first and newest first within a match. Each
+    has `matches`: its best matching assignments as highlighted
+    "Subject — Faculty" HTML.
+    """
+    query = fts_query(text)
+    if not query or not search_available():
+        return []
+
+    # The archive filters go into the FTS query, so only snapshots that can
+    # be shown are ranked. The unary + keeps SQLite from handing the IN list
+    # to FTS5 as one lookup per value (seconds instead of milliseconds over
+    # a few thousand archives).
+    archive_sql, archive_params = archives.order_by().values('snapshot_id').query.sql_with_params()
+    ranked = {}
+    with default_connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT snapshot_id, highlight({FTS_TABLE}, 1, %s, %s), highlight({FTS_TABLE}, 2, %s, %s) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND +snapshot_id IN ({archive_sql}) "
+            f"ORDER BY bm25({FTS_TABLE}, %s, %s, %s, %s)",
+            [MARK_START, MARK_END, MARK_START, MARK_END, query, *archive_params, *WEIGHTS],
+        )
+        # Rows come best first; stop once enough snapshots have been seen
+        while len(ranked) < limit:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for snapshot_id, subject, faculty in rows:
+                if snapshot_id not in ranked and len(ranked) >= limit:
+                    continue
+                matches = ranked.setdefault(snapshot_id, [])
+                if len(matches) < MATCHES_SHOWN:
+                    matches.append(mark_safe(
+                        _highlighted(subject) + (f' — {_highlighted(faculty)}' if faculty else '')
+                    ))
+
+    position = {snapshot_id: index for index, snapshot_id in enumerate(ranked)}
+    records = list(archives.filter(snapshot_id__in=ranked).select_related('department'))
+    for record in records:
+        record.matches = ranked[record.snapshot_id]
+    records.sort(key=lambda record: (
+        position[record.snapshot_id], -record.year, -record.created_at.timestamp(),
+    ))
+    return records
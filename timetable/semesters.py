@@ -0,0 +1,48 @@
+# timetable/semesters.py
+"""
+Semester structure of each department.
+
+How many semesters a department runs is Department.semester_count (set in
+the admin), so a new programme needs no code change. Views, forms and
+exports ask here instead of reading departments: the counts of all
+departments are loaded with one query on first use and kept in this
+process until a department is saved or deleted (see signals.py). Other
+worker processes pick the change up after RELOAD_AFTER seconds at most.
+"""
+import time
+
+DEFAULT_SEMESTER_COUNT = 6
+MAX_SEMESTERS = 12
+RELOAD_AFTER = 300  # seconds
+
+_counts = None
+_loaded_at = 0.0
+
+
+def semester_labels(count):
+    return [f'Semester {number}' for number in range(1, count + 1)]
+
+SEMESTER_CHOICES = [(label, label) for label in semester_labels(MAX_SEMESTERS)]
+
+
+def _semester_counts(department_id=None):
+    global _counts, _loaded_at
+    if (_counts is None or time.monotonic() - _loaded_at > RELOAD_AFTER
+            or (department_id is not None and department_id not in _counts)):
+        from .models import Department
+
+        _counts = dict(Department.objects.values_list('id', 'semester_count'))
+        _loaded_at = time.monotonic()
+    return _counts
+
+def clear_semester_cache():
+    global _counts
+    _counts = None
+
+def semesters_for(department_id):
+    """Semester labels of a department, e.g. ['Semester 1', ..., 'Semester 4']"""
+    return semester_labels(_semester_counts(department_id).get(department_id, DEFAULT_SEMESTER_COUNT))
+
+def college_semesters():
+    """Every semester label some department uses, for cross-department filters"""
+    return semester_labels(max(_semester_counts().values(), default=DEFAULT_SEMESTER_COUNT))
@@ -0,0 +1,92 @@
+# timetable/signals.py
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .availability import clear_availability
+from .models import ArchiveSnapshot, ArchiveYear, Department, Faculty, TimetableEntry, TimetableHistory
+from .search import index_snapshot, unindex_snapshot
+from .semesters import clear_semester_cache
+from .stats import invalidate_dashboard_stats
+from .versions import bump_department_timetables, bump_faculty_timetables, bump_timetable_versions
+
+
+@receiver(pre_save, sender=TimetableEntry)
+def remember_previous_timetable(sender, instance, **kwargs):
+    # An edit (e.g. in the admin) can move an entry to another timetable;
+    # both the old and the new one change.
+    instance._previous_timetable = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_timetable = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('department_id', 'semester').first()
+
+@receiver(post_save, sender=TimetableEntry)
+def entry_saved(sender, instance, **kwargs):
+    timetables = [(instance.department_id, instance.semester)]
+    previous = getattr(instance, '_previous_timetable', None)
+    if previous:
+        timetables.append(previous)
+    bump_timetable_versions(timetables)
+
+@receiver(post_delete, sender=TimetableEntry)
+def entry_deleted(sender, instance, **kwargs):
+    bump_timetable_versions([(instance.department_id, instance.semester)])
+
+@receiver(post_save, sender=Department)
+def department_saved(sender, instance, created, **kwargs):
+    clear_semester_cache()
+    if not created:
+        bump_department_timetables(instance)
+
+@receiver(post_delete, sender=Department)
+def department_deleted(sender, instance, **kwargs):
+    clear_semester_cache()
+
+@receiver(post_save, sender=Faculty)
+def faculty_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_faculty_timetables(instance)
+
+@receiver(pre_delete, sender=Faculty)
+def faculty_deleted(sender, instance, **kwargs):
+    # Entries keep the slot with faculty set to NULL
+    bump_faculty_timetables(instance)
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+@receiver(post_save, sender=TimetableEntry)
+@receiver(post_delete, sender=TimetableEntry)
+def timetable_data_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+    clear_availability()
+
+@receiver(post_save, sender=TimetableHistory)
+def archive_saved(sender, instance, created, **kwargs):
+    if created:
+        ArchiveYear.objects.get_or_create(department_id=instance.department_id, year=instance.year)
+        ArchiveYear.objects.filter(
+            department_id=instance.department_id, year=instance.year
+        ).update(archive_count=F('archive_count') + 1)
+
+@receiver(post_delete, sender=TimetableHistory)
+def archive_deleted(sender, instance, **kwargs):
+    years = ArchiveYear.objects.filter(department_id=instance.department_id, year=instance.year)
+    years.filter(archive_count__lte=1).delete()
+    years.update(archive_count=F('archive_count') - 1)
+
+    # Snapshots are shared by identical archives; drop it with its last one
+    ArchiveSnapshot.objects.filter(
+        id=instance.snapshot_id, archives__isnull=True
+    ).delete()
+
+@receiver(post_save, sender=ArchiveSnapshot)
+def snapshot_saved(sender, instance, created, **kwargs):
+    if created:
+        index_snapshot(instance.id, instance.entries())
+
+@receiver(post_delete, sender=ArchiveSnapshot)
+def snapshot_deleted(sender, instance, **kwargs):
+    unindex_snapshot(instance.id)
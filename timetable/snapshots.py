@@ -0,0 +1,134 @@
+# timetable/snapshots.py
+"""
+Compact encoding of archived timetables (TimetableHistory).
+
+An archive is stored column by column instead of as one dict per entry:
+subjects, faculty names and days are interned into a single string table
+and referenced by index, and times are minutes since midnight. The JSON is
+zlib compressed. Entries are put in a canonical order first, so the same
+timetable always encodes to the same bytes and its sha256 can be used to
+store identical archives once (see ArchiveSnapshot).
+
+decode_snapshot() gives back the entry dicts archives have always had:
+subject, faculty, day, and start_time/end_time as '09:00 AM'. Archives
+never change, so the matrix the history page shows is built once with
+build_matrix() and stored next to them (pack()/unpack()).
+"""
+import hashlib
+import json
+import zlib
+from datetime import datetime, time
+
+FORMAT_VERSION = 1
+TIME_FORMAT = '%I:%M %p'
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+DAY_ORDER = {day: index for index, day in enumerate(DAYS)}
+BREAK_FACULTY = 'Break/Recess'
+
+
+def _minutes(value):
+    """Minutes since midnight of a time or a '09:00 AM' string"""
+    if isinstance(value, str):
+        value = datetime.strptime(value, TIME_FORMAT).time()
+    return value.hour * 60 + value.minute
+
+def _time_label(minutes):
+    return time(minutes // 60, minutes % 60).strftime(TIME_FORMAT)
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def pack(value):
+    """Compressed JSON of `value`"""
+    return zlib.compress(_dumps(value), 9)
+
+def unpack(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def encode_snapshot(items):
+    """
+    Returns (digest, data) for a list of entry dicts with subject, faculty,
+    day, start_time and end_time (times or '09:00 AM' strings).
+    """
+    rows = sorted(
+        (_minutes(item['start_time']), _minutes(item['end_time']),
+         DAY_ORDER.get(item['day'], len(DAY_ORDER)), item['day'],
+         item['subject'], item['faculty'] or '', item['faculty'])
+        for item in items
+    )
+
+    strings = {}
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    columns = {'subject': [], 'faculty': [], 'day': [], 'start': [], 'end': []}
+    for start, end, _, day, subject, _, faculty in rows:
+        columns['subject'].append(intern(subject))
+        columns['faculty'].append(intern(faculty))
+        columns['day'].append(intern(day))
+        columns['start'].append(start)
+        columns['end'].append(end)
+
+    payload = _dumps({'v': FORMAT_VERSION, 'strings': list(strings), **columns})
+    return hashlib.sha256(payload).hexdigest(), zlib.compress(payload, 9)
+
+def decode_snapshot(data):
+    """The entry dicts stored by encode_snapshot(), ordered by time"""
+    payload = unpack(data)
+    if payload['v'] != FORMAT_VERSION:
+        raise ValueError(f"Unknown timetable snapshot format {payload['v']}")
+
+    strings = payload['strings']
+    labels = {}
+    return [
+        {
+            'subject': strings[subject],
+            'faculty': strings[faculty],
+            'day': strings[day],
+            'start_time': labels.get(start) or labels.setdefault(start, _time_label(start)),
+            'end_time': labels.get(end) or labels.setdefault(end, _time_label(end)),
+        }
+        for subject, faculty, day, start, end in zip(
+            payload['subject'], payload['faculty'], payload['day'], payload['start'], payload['end'],
+        )
+    ]
+
+
+def build_matrix(entries, days=DAYS):
+    """
+    Rows of the archived timetable as history_detail.html shows them, in
+    time order: [{'time': '09:00 AM - 10:00 AM', 'data': [cell per day]}].
+    A cell is a list of entries; several entries of one subject in the same
+    slot are a lab session, shown as a single entry listing its teachers.
+    """
+    slots = {}
+    for entry in entries:
+        key = (_minutes(entry['start_time']), _minutes(entry['end_time']))
+        if key not in slots:
+            slots[key] = {
+                'time': f"{entry['start_time']} - {entry['end_time']}",
+                'days': {day: [] for day in days},
+            }
+        if entry['day'] in slots[key]['days']:
+            slots[key]['days'][entry['day']].append(entry)
+
+    matrix = []
+    for key in sorted(slots):
+        row_data = []
+        for day in days:
+            day_entries = slots[key]['days'][day]
+            subjects = {entry['subject'] for entry in day_entries}
+            if len(day_entries) > 1 and len(subjects) == 1:
+                row_data.append([{
+                    'is_lab': True,
+                    'subject': subjects.pop(),
+                    'faculties': [entry['faculty'] for entry in day_entries
+                                  if entry['faculty'] != BREAK_FACULTY],
+                    'faculty': None,
+                }])
+            else:
+                row_data.append(day_entries)
+        matrix.append({'time': slots[key]['time'], 'data': row_data})
+    return matrix
@@ -0,0 +1,101 @@
+# timetable/stats.py
+"""
+Dashboard statistics.
+
+Every number on the dashboard comes from one aggregate query over
+departments, their entries and their faculty. The result is cached per
+process: a write drops it in the process that made the write (see
+signals.py), and other processes recompute it once CACHE_TIMEOUT has
+passed. The query cost does not grow with the number of departments or
+semesters shown.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Department, Faculty, TimetableEntry
+
+CACHE_KEY = 'timetable-dashboard-stats'
+# Seconds other workers may show numbers from before a write
+CACHE_TIMEOUT = 60
+SEMESTERS = [semester for semester, _ in TimetableEntry.SEMESTER_CHOICES]
+# Same words the entry forms use to recognise a break
+BREAK_WORDS = ['recess', 'lunch', 'break', 'interval']
+
+
+def _is_break():
+    query = Q()
+    for word in BREAK_WORDS:
+        query |= Q(timetableentry__subject__icontains=word)
+    return query
+
+def _entries(condition=Q()):
+    return Count('timetableentry', filter=condition)
+
+def _count_subquery(queryset, group_by='department'):
+    counts = queryset.order_by().values(group_by).annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(counts[:1], output_field=IntegerField()), Value(0))
+
+def compute_dashboard_stats():
+    """
+    Per-department and college-wide numbers for the dashboard:
+    entries per semester and in the active semester, classes, breaks,
+    slots whose faculty was removed and faculty count.
+    """
+    no_faculty = Q(timetableentry__faculty__isnull=True)
+    semester_counts = {
+        f'semester_{index}': _entries(Q(timetableentry__semester=semester))
+        for index, semester in enumerate(SEMESTERS)
+    }
+
+    rows = Department.objects.order_by('name', 'id').annotate(
+        entry_count=_entries(),
+        active_count=_entries(Q(timetableentry__semester=F('active_semester'))),
+        break_count=_entries(no_faculty & _is_break()),
+        unassigned_count=_entries(no_faculty & ~_is_break()),
+        # Subqueries, so faculty rows do not multiply the entry counts
+        faculty_count=_count_subquery(Faculty.objects.filter(department=OuterRef('pk'))),
+        # Faculty without a department are on no department's row
+        college_faculty_count=_count_subquery(
+            Faculty.objects.annotate(college=Value(1)), group_by='college'
+        ),
+        **semester_counts,
+    ).values('id', 'name', 'active_semester', 'entry_count', 'active_count',
+             'break_count', 'unassigned_count', 'faculty_count', 'college_faculty_count',
+             *semester_counts)
+
+    departments = []
+    college_faculty_count = 0
+    for row in rows:
+        college_faculty_count = row.pop('college_faculty_count')
+        row['class_count'] = row['entry_count'] - row['break_count'] - row['unassigned_count']
+        row['semesters'] = [
+            (semester, row.pop(f'semester_{index}')) for index, semester in enumerate(SEMESTERS)
+        ]
+        departments.append(row)
+
+    def total(field):
+        return sum(row[field] for row in departments)
+
+    return {
+        'departments': departments,
+        'dept_count': len(departments),
+        'faculty_count': college_faculty_count,
+        'entry_count': total('entry_count'),
+        'class_count': total('class_count'),
+        'unassigned_count': total('unassigned_count'),
+    }
+
+def dashboard_stats():
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(CACHE_KEY, stats, timeout=CACHE_TIMEOUT)
+    return stats
+
+def invalidate_dashboard_stats():
+    # Again on commit, in case another request cached the old numbers
+    # while the writing transaction was still open
+    cache.delete(CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
@@ -1,3 +1,1239 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .availability import clear_availability, get_availability
+from .conflicts import find_faculty_conflicts
+from .exporters import EXPORT_FORMATS, render_export
+from .exporters.bundle import stream_bundle
+from .exporters.cache import render_cached_export
+from .exporters.encoding import encode_image
+from .exporters.excel import render_excel, sheet_title, write_workbook
+from .exporters.image import ImageLayout, ShareImageLayout, draw_timetable_image, title_layer
+from .exporters.pdf import TimetableDocTemplate, pdf_render_stats, pdf_styles, render_pdf
+from .exporters.stream import archived_records, stream_csv, stream_json
+from .fonts import BUNDLED_FONT_DIR, _font_files, font_path, get_font
+from .grid import FacultyTimetableGrid, TimetableGrid
+from .jobs import EXPORT_FAILED, run_export_job
+from .models import (
+    ArchiveSnapshot, ArchiveYear, Department, ExportJob, Faculty, TimetableEntry, TimetableHistory,
+    TimetableVersion,
+)
+from .pagination import keyset_page
+from .scheduling import create_entries
+from .search import fts_query, search_archives
+from .semesters import semesters_for
+from .snapshots import build_matrix, decode_snapshot, encode_snapshot
+from .stats import CACHE_KEY, CACHE_TIMEOUT, dashboard_stats
+from .versions import get_timetable_version
+from .workload import faculty_workload
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class TimetableIndexTests(TestCase):
+    """The hot-path filters should be answered from the composite indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.faculty = Faculty.objects.create(name='Prof A', department=cls.department)
+        TimetableEntry.objects.create(
+            department=cls.department, faculty=cls.faculty, subject='Maths',
+            semester='Semester 1', day='Monday',
+            start_time=time(9), end_time=time(10),
+        )
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.query_plan(queryset)
+        self.assertIn(index_name, plan, f'{index_name} not used:\n{plan}')
+
+    def test_semester_grid_uses_department_semester_index(self):
+        queryset = TimetableEntry.objects.filter(
+            department=self.department, semester='Semester 1'
+        ).order_by('start_time', 'end_time', 'id')
+        self.assertUsesIndex(queryset, 'entry_dept_sem_slot_idx')
+
+    def test_slot_lookup_uses_department_semester_index(self):
+        queryset = TimetableEntry.objects.filter(
+            department=self.department, semester='Semester 1', day='Monday',
+            start_time=time(9), end_time=time(10),
+        )
+        self.assertUsesIndex(queryset, 'entry_dept_sem_slot_idx')
+
+    def test_faculty_conflict_uses_faculty_index(self):
+        queryset = TimetableEntry.objects.filter(
+            faculty=self.faculty, day='Monday',
+            start_time__lt=time(11), end_time__gt=time(9, 30),
+        )
+        self.assertUsesIndex(queryset, 'entry_faculty_day_time_idx')
+
+    def test_faculty_week_uses_faculty_index(self):
+        queryset = FacultyTimetableGrid.week_entries(self.faculty)
+        self.assertUsesIndex(queryset, 'entry_faculty_day_time_idx')
+
+    def test_department_history_uses_history_index(self):
+        queryset = TimetableHistory.objects.filter(
+            department=self.department
+        ).order_by('-year', '-created_at')
+        self.assertUsesIndex(queryset, 'history_dept_year_created_idx')
+
+    def test_archive_search_uses_history_index(self):
+        queryset = TimetableHistory.objects.filter(
+            department_id=self.department.id, year=2026, semester__icontains='Semester 1'
+        ).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'history_dept_year_created_idx')
+
+
+class TimetableGridTests(TestCase):
+    """The page matrix is built from one query of the semester's entries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.prof_a = Faculty.objects.create(name='Prof A', department=cls.department)
+        cls.prof_b = Faculty.objects.create(name='Prof B', department=cls.department)
+        for day, subject, faculty, start in [
+            ('Monday', 'Java', cls.prof_a, 9),
+            ('Monday', 'Java', cls.prof_b, 9),
+            ('Tuesday', 'Maths', cls.prof_a, 9),
+            ('Tuesday', 'Physics', cls.prof_b, 9),
+            ('Monday', 'Lunch Break', None, 12),
+            ('Wednesday', 'Chemistry', None, 10),
+            ('Wednesday', 'Chemistry', None, 10),
+        ]:
+            TimetableEntry.objects.create(
+                department=cls.department, faculty=faculty, subject=subject, semester='Semester 1',
+                day=day, start_time=time(start), end_time=time(start + 1),
+            )
+
+    def cells(self, matrix, label):
+        [row] = [row for row in matrix if row['time'] == label]
+        return dict(zip(TimetableGrid.for_semester(self.department, 'Semester 1').days, row['data']))
+
+    def test_one_query_builds_the_matrix(self):
+        with self.assertNumQueries(1):
+            matrix = TimetableGrid.for_semester(self.department, 'Semester 1').view_matrix()
+        self.assertEqual([row['time'] for row in matrix],
+                         ['09:00 AM - 10:00 AM', '10:00 AM - 11:00 AM', '12:00 PM - 01:00 PM'])
+
+        nine = self.cells(matrix, '09:00 AM - 10:00 AM')
+        [lab] = nine['Monday']
+        java = TimetableEntry.objects.filter(subject='Java').order_by('id')
+        self.assertEqual(lab, {
+            'is_lab': True, 'subject': 'Java', 'faculties': ['Prof A', 'Prof B'], 'faculty': None,
+            'id': java[0].id, 'all_ids': [entry.id for entry in java],
+        })
+        # Different subjects in one slot stay separate entries
+        self.assertEqual([entry.subject for entry in nine['Tuesday']], ['Maths', 'Physics'])
+        self.assertEqual(nine['Friday'], [])
+
+        [lunch] = self.cells(matrix, '12:00 PM - 01:00 PM')['Monday']
+        self.assertEqual((lunch.subject, lunch.faculty), ('Lunch Break', None))
+        [chemistry] = self.cells(matrix, '10:00 AM - 11:00 AM')['Wednesday']
+        self.assertEqual((chemistry['is_lab'], chemistry['faculties']), (True, []))
+
+    def test_page_queries_do_not_grow_with_slots(self):
+        url = reverse('timetable_view', args=[self.department.id]) + '?semester=Semester 1'
+
+        def page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries), response
+
+        page_queries()  # Warms the cached semester list
+        before, response = page_queries()
+        self.assertContains(response, 'Prof B')
+        self.assertContains(response, 'Lunch Break')
+        for hour in range(13, 17):
+            for day in ['Monday', 'Thursday', 'Friday']:
+                TimetableEntry.objects.create(
+                    department=self.department, faculty=self.prof_a, subject='Maths', semester='Semester 1',
+                    day=day, start_time=time(hour), end_time=time(hour + 1),
+                )
+        self.assertEqual(page_queries()[0], before)
+
+
+class GridExportTests(TestCase):
+    """Every exporter renders from one grid query and the same cell text"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        for day, subject, name in [
+            ('Monday', 'Java', 'Prof A'),
+            ('Monday', 'Java', 'Prof B'),
+            ('Tuesday', 'Chemistry', None),
+            ('Tuesday', 'Chemistry', None),
+            ('Wednesday', 'Recess', None),
+        ]:
+            TimetableEntry.objects.create(
+                department=cls.department, subject=subject, semester='Semester 1', day=day,
+                faculty=name and Faculty.objects.create(name=name, department=cls.department),
+                start_time=time(9), end_time=time(10),
+            )
+
+    def grid(self):
+        return TimetableGrid.for_semester(self.department, 'Semester 1')
+
+    def test_cell_lines(self):
+        monday, tuesday, wednesday = self.grid().rows[0].cells[:3]
+        self.assertEqual(monday.lines(), ['Java (Lab)', 'Prof A', 'Prof B'])
+        self.assertEqual(tuesday.lines(), ['Chemistry (Lab)', 'No teachers assigned'])
+        self.assertEqual(wednesday.lines(), ['Recess', 'Break'])
+        self.assertTrue(wednesday.is_break)
+
+    def test_each_format_renders_from_one_query(self):
+        for format_name in ['csv', 'json', 'excel', 'word']:
+            with self.assertNumQueries(1):
+                content = render_export(format_name, self.grid())
+            self.assertTrue(content, format_name)
+
+        rows = list(csv.reader(StringIO(render_export('csv', self.grid()).decode())))
+        self.assertEqual(rows[5][1:4], [
+            'Java (Lab)\\nProf A\\nProf B', 'Chemistry (Lab)\\nNo teachers assigned', 'Recess\\nBreak',
+        ])
+        timetable = json.loads(render_export('json', self.grid()))['timetable']['09:00-10:00']
+        self.assertEqual([entry['is_break'] for entry in timetable['Wednesday']], [True])
+
+
+class FacultyConflictTests(TestCase):
+    """A teacher is busy with overlapping entries in any active semester"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bca = Department.objects.create(name='BCA')
+        cls.mca = Department.objects.create(name='MCA', active_semester='Semester 2')
+        cls.prof_a = Faculty.objects.create(name='Prof A', department=cls.bca)
+        cls.prof_b = Faculty.objects.create(name='Prof B', department=cls.mca)
+        cls.maths = TimetableEntry.objects.create(
+            department=cls.bca, faculty=cls.prof_a, subject='Maths', semester='Semester 1',
+            day='Monday', start_time=time(9), end_time=time(10),
+        )
+        cls.cloud = TimetableEntry.objects.create(
+            department=cls.mca, faculty=cls.prof_b, subject='Cloud', semester='Semester 2',
+            day='Monday', start_time=time(11), end_time=time(13),
+        )
+        # MCA Semester 1 is not active, so it keeps nobody busy
+        TimetableEntry.objects.create(
+            department=cls.mca, faculty=cls.prof_a, subject='Old Course', semester='Semester 1',
+            day='Monday', start_time=time(11), end_time=time(13),
+        )
+
+    def test_all_faculty_and_slots_in_one_query(self):
+        slots = [('Monday', time(9, 30), time(11, 30)), ('Tuesday', time(9), time(10))]
+        with self.assertNumQueries(1):
+            conflicts = find_faculty_conflicts([self.prof_a, self.prof_b, None], slots)
+        self.assertEqual(conflicts, [self.maths, self.cloud])
+
+    def test_touching_slots_do_not_conflict(self):
+        slots = [('Monday', time(10), time(11)), ('Monday', time(13), time(14))]
+        self.assertEqual(find_faculty_conflicts([self.prof_a, self.prof_b], slots), [])
+
+    def test_labs_may_share_their_own_department(self):
+        slot = [('Monday', time(9), time(10))]
+        self.assertEqual(find_faculty_conflicts([self.prof_a], slot, current_dept=self.bca, is_lab=True), [])
+        self.assertEqual(find_faculty_conflicts([self.prof_a], slot, current_dept=self.mca, is_lab=True), [self.maths])
+        self.assertEqual(find_faculty_conflicts([self.prof_a], slot, exclude_ids=[self.maths.id]), [])
+
+
+class BulkCreateTests(TestCase):
+    """A batch of slots is checked as a whole and written all or nothing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.prof_a = Faculty.objects.create(name='Prof A', department=cls.department)
+        cls.prof_b = Faculty.objects.create(name='Prof B', department=cls.department)
+
+    def create(self, slots, **kwargs):
+        return create_entries(self.department, 'Semester 1', 'Java Lab', slots, **kwargs)
+
+    def post(self, **payload):
+        payload = {'department': self.department.id, 'subject': 'Java Lab', **payload}
+        return self.client.post(
+            reverse('timetable_bulk_create'), json.dumps(payload), content_type='application/json'
+        )
+
+    def test_lab_teachers_share_a_slot(self):
+        created = self.create(
+            [('Monday', time(10), time(12)), ('Wednesday', time(10), time(12))],
+            faculties=[self.prof_a, self.prof_b], is_lab=True,
+        )
+        self.assertEqual(len(created), 4)
+
+    def test_a_conflict_rolls_back_the_whole_batch(self):
+        self.create([('Tuesday', time(9), time(10))], faculties=[self.prof_a])
+        with self.assertRaises(ValidationError) as raised:
+            self.create(
+                [('Monday', time(9), time(10)), ('Tuesday', time(9, 30), time(11))],
+                faculties=[self.prof_a],
+            )
+        self.assertIn('CONFLICT: Prof A', raised.exception.messages[0])
+        self.assertEqual(TimetableEntry.objects.count(), 1)
+
+    def test_slots_of_one_batch_may_not_overlap(self):
+        with self.assertRaises(ValidationError) as raised:
+            self.create(
+                [('Monday', time(9), time(11)), ('Monday', time(10), time(12)), ('Monday', time(12), time(13))],
+                faculties=[self.prof_a],
+            )
+        self.assertEqual(raised.exception.messages, [
+            'Monday 09:00 AM - 11:00 AM and Monday 10:00 AM - 12:00 PM overlap in BCA - Semester 1.',
+            'Prof A cannot teach Monday 09:00 AM - 11:00 AM and Monday 10:00 AM - 12:00 PM at the same time.',
+        ])
+        self.assertFalse(TimetableEntry.objects.exists())
+
+    def test_all_day_breaks_skip_occupied_slots(self):
+        self.create([('Monday', time(13), time(14))], faculties=[self.prof_a])
+        created = create_entries(
+            self.department, 'Semester 1', 'Lunch Break',
+            [(day, time(13), time(14)) for day in ['Monday', 'Tuesday']], skip_occupied=True,
+        )
+        self.assertEqual([entry.day for entry in created], ['Tuesday'])
+
+    def test_bulk_api_only_lets_labs_have_several_teachers(self):
+        slots = [{'day': 'Monday', 'start_time': '10:00', 'end_time': '12:00'}]
+        response = self.post(is_lab=False, faculty=[self.prof_a.id, self.prof_b.id], slots=slots)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['Only a lab session can have more than one teacher.'])
+        self.assertFalse(TimetableEntry.objects.exists())
+
+        response = self.post(faculty=[self.prof_a.id, self.prof_b.id], slots=slots)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 2)
+
+
+class ExportCacheTests(TestCase):
+    """Exports are rendered once per timetable version"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.faculty = Faculty.objects.create(name='Prof A', department=cls.department)
+        TimetableEntry.objects.create(
+            department=cls.department, faculty=cls.faculty, subject='Maths', semester='Semester 1',
+            day='Monday', start_time=time(9), end_time=time(10),
+        )
+
+    def setUp(self):
+        caches['exports'].clear()
+
+    def render(self):
+        version = get_timetable_version(self.department, 'Semester 1').version
+        return render_cached_export('csv', self.department, 'Semester 1', version)
+
+    def test_unchanged_timetables_are_not_rendered_again(self):
+        version = get_timetable_version(self.department, 'Semester 1').version
+        with self.assertNumQueries(1):
+            first = render_cached_export('csv', self.department, 'Semester 1', version)
+        with self.assertNumQueries(0):
+            self.assertEqual(render_cached_export('csv', self.department, 'Semester 1', version), first)
+
+    def test_a_change_gives_a_fresh_render(self):
+        before = self.render()
+        self.faculty.name = 'Prof Z'
+        self.faculty.save()
+        self.assertNotIn(b'Prof Z', before)
+        self.assertIn(b'Prof Z', self.render())
+
+
+class TimetableRevalidationTests(TestCase):
+    """Pages and downloads carry an ETag that changes with the timetable version"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.faculty = Faculty.objects.create(name='Prof A', department=cls.department)
+        cls.entry = TimetableEntry.objects.create(
+            department=cls.department, faculty=cls.faculty, subject='Maths', semester='Semester 1',
+            day='Monday', start_time=time(9), end_time=time(10),
+        )
+
+    def version(self, semester='Semester 1'):
+        return TimetableVersion.objects.get(department=self.department, semester=semester).version
+
+    def test_writes_bump_the_timetable_version(self):
+        start = self.version()
+        self.entry.subject = 'Physics'
+        self.entry.save()
+        self.assertEqual(self.version(), start + 1)
+
+        # Moving an entry changes both timetables
+        self.entry.semester = 'Semester 2'
+        self.entry.save()
+        self.assertEqual((self.version(), self.version('Semester 2')), (start + 2, 1))
+
+        self.faculty.name = 'Prof Z'
+        self.faculty.save()
+        self.department.name = 'BCA (Hons)'
+        self.department.save()
+        self.entry.delete()
+        self.assertEqual(self.version('Semester 2'), 4)
+
+    def test_unchanged_pages_and_downloads_get_304(self):
+        for name in ['timetable_view', 'download_timetable_csv', 'download_timetable_json']:
+            url = reverse(name, args=[self.department.id]) + '?semester=Semester 1'
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, name
+            )
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304, name
+            )
+
+        url = reverse('timetable_view', args=[self.department.id]) + '?semester=Semester 1'
+        etag = self.client.get(url)['ETag']
+        TimetableEntry.objects.create(
+            department=self.department, faculty=self.faculty, subject='Java', semester='Semester 1',
+            day='Tuesday', start_time=time(9), end_time=time(10),
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Java')
+
+    def test_revalidation_skips_the_entries_table(self):
+        url = reverse('download_timetable_csv', args=[self.department.id]) + '?semester=Semester 1'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportJobTests(TestCase):
+    """Background exports share the version-keyed cache and are revalidated"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.addClassCleanup(shutil.rmtree, settings.MEDIA_ROOT, ignore_errors=True)
+        cls.department = Department.objects.create(name='BCA')
+        TimetableEntry.objects.create(
+            department=cls.department, faculty=Faculty.objects.create(name='Prof A'), subject='Maths',
+            semester='Semester 1', day='Monday', start_time=time(9), end_time=time(10),
+        )
+
+    def setUp(self):
+        caches['exports'].clear()
+
+    def start(self, **data):
+        return self.client.post(
+            reverse('start_export_job', args=[self.department.id]),
+            {'semester': 'Semester 1', 'format': 'image', **data},
+        )
+
+    def test_starting_a_job_needs_a_post(self):
+        response = self.client.get(
+            reverse('start_export_job', args=[self.department.id]) + '?format=pdf'
+        )
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_cached_versions_are_served_without_a_job(self):
+        url = reverse('download_timetable_image', args=[self.department.id])
+        self.client.get(url, {'semester': 'Semester 1', 'mode': 'webp'})
+
+        response = self.start(mode='webp')
+        self.assertRedirects(
+            response, f'{url}?semester=Semester+1&mode=webp&level=6', fetch_redirect_response=False
+        )
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_jobs_render_with_their_options_and_fill_the_cache(self):
+        job = ExportJob.objects.create(
+            department=self.department, semester='Semester 1', format='image',
+            version=get_timetable_version(self.department, 'Semester 1').version,
+            options={'mode': 'webp', 'level': 1},
+        )
+        run_export_job(job)
+
+        url = reverse('download_export_job', args=[job.id])
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('BCA_Semester_1_Timetable.webp', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content)[8:12], b'WEBP')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # The next request for the same version is answered from the cache
+        direct = reverse('download_timetable_image', args=[self.department.id])
+        self.assertTrue(self.start(mode='webp', level=1)['Location'].startswith(direct))
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+    def test_failures_are_logged_not_shown(self):
+        job = ExportJob.objects.create(
+            department=self.department, semester='Semester 1', format='pdf', version=0,
+        )
+        error = OSError('/srv/fonts/secret.ttf: no such file')
+        with mock.patch('timetable.jobs.render_export', side_effect=error):
+            with self.assertLogs('timetable.jobs', 'ERROR') as logs:
+                run_export_job(job)
+
+        self.assertIn('secret.ttf', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (ExportJob.FAILED, EXPORT_FAILED))
+        response = self.client.get(reverse('export_job_status', args=[job.id]))
+        self.assertContains(response, EXPORT_FAILED)
+        self.assertNotContains(response, 'secret.ttf')
+
+
+class CollegeDumpTests(TestCase):
+    """The streamed CSV and JSON dumps carry the same rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        bca = Department.objects.create(name='BCA')
+        mca = Department.objects.create(name='MCA')
+        faculty = Faculty.objects.create(name='Prof A', department=bca)
+        for department, semester, subject, member in [
+            (mca, 'Semester 2', 'Cloud', faculty),
+            (bca, 'Semester 1', 'Maths', faculty),
+            (bca, 'Semester 1', 'Lunch Break', None),
+            (bca, 'Semester 3', 'Java', faculty),
+        ]:
+            TimetableEntry.objects.create(
+                department=department, faculty=member, subject=subject, semester=semester,
+                day='Monday', start_time=time(9 if member else 13), end_time=time(10 if member else 14),
+            )
+        TimetableHistory.objects.create(
+            department=bca, semester='Semester 1', year=2025, snapshot=ArchiveSnapshot.store([
+                {'subject': 'Physics', 'faculty': 'Prof B', 'day': 'Friday',
+                 'start_time': time(11), 'end_time': time(12)},
+            ]),
+        )
+
+    def test_the_header_goes_out_before_any_query(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(next(stream_csv()).startswith('Source,Department,Semester'))
+            self.assertEqual(next(stream_json()), '{\n')
+
+    def test_csv_and_json_agree(self):
+        response = self.client.get(reverse('download_college_csv'))
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+
+        response = self.client.get(reverse('download_college_json'))
+        dump = json.loads(b''.join(response.streaming_content))
+
+        from_json = [
+            ('Current', timetable['department'], timetable['semester'], '', entry['subject'],
+             entry['faculty'] or 'Break/Recess')
+            for timetable in dump['timetables'] for entry in timetable['entries']
+        ] + [
+            ('Archive', archive['department'], archive['semester'], str(archive['year']),
+             entry['subject'], entry['faculty'])
+            for archive in dump['archives'] for entry in archive['entries']
+        ]
+        from_csv = [
+            (row['Source'], row['Department'], row['Semester'], row['Year'], row['Subject'], row['Faculty'])
+            for row in rows
+        ]
+        self.assertEqual(from_csv, from_json)
+        self.assertEqual([timetable['semester'] for timetable in dump['timetables']],
+                         ['Semester 1', 'Semester 3', 'Semester 2'])
+        self.assertEqual(from_csv[1][4:], ('Lunch Break', 'Break/Recess'))
+
+    def test_archives_skip_the_packed_matrix(self):
+        with self.assertNumQueries(1):
+            records = list(archived_records())
+            self.assertEqual(records[0].department.name, 'BCA')
+            self.assertEqual(records[0].entries[0]['subject'], 'Physics')
+        self.assertEqual(records[0].snapshot.get_deferred_fields(), {'matrix_data'})
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool that records how many results were pending at most"""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = self.pending = self.peak = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+        future = super().submit(*args, **kwargs)
+        result = future.result
+
+        def collect(*args, **kwargs):
+            self.pending -= 1
+            return result(*args, **kwargs)
+
+        future.result = collect
+        return future
+
+
+class BundleTests(TestCase):
+    """The ZIP bundle holds every timetable and renders a few at a time"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bca = Department.objects.create(name='BCA')
+        mca = Department.objects.create(name='MCA')
+        faculty = Faculty.objects.create(name='Prof A')
+        for department, semester in [(cls.bca, 'Semester 1'), (cls.bca, 'Semester 2'), (mca, 'Semester 1')]:
+            TimetableEntry.objects.create(
+                department=department, faculty=faculty, subject='Maths', semester=semester,
+                day='Monday', start_time=time(9), end_time=time(10),
+            )
+
+    def setUp(self):
+        caches['exports'].clear()
+
+    def bundle(self, executor, **kwargs):
+        data = b''.join(stream_bundle(['csv', 'json'], executor, **kwargs))
+        return zipfile.ZipFile(BytesIO(data))
+
+    def test_every_timetable_in_every_format(self):
+        with CountingExecutor() as executor:
+            archive = self.bundle(executor, max_in_flight=2)
+
+        self.assertEqual(sorted(archive.namelist()), [
+            'BCA/BCA_Semester_1_Timetable.csv', 'BCA/BCA_Semester_1_Timetable.json',
+            'BCA/BCA_Semester_2_Timetable.csv', 'BCA/BCA_Semester_2_Timetable.json',
+            'MCA/MCA_Semester_1_Timetable.csv', 'MCA/MCA_Semester_1_Timetable.json',
+        ])
+        self.assertEqual(executor.submitted, 6)
+        self.assertLessEqual(executor.peak, 2)
+
+        version = get_timetable_version(self.bca, 'Semester 1').version
+        self.assertEqual(
+            archive.read('BCA/BCA_Semester_1_Timetable.csv'),
+            render_cached_export('csv', self.bca, 'Semester 1', version),
+        )
+
+    def test_cached_renders_are_reused(self):
+        with CountingExecutor() as executor:
+            self.bundle(executor)
+        with CountingExecutor() as executor:
+            self.assertEqual(len(self.bundle(executor).namelist()), 6)
+        self.assertEqual(executor.submitted, 0)
+
+
+class FontRegistryTests(TestCase):
+    """Font files are found once and fonts loaded once per size"""
+
+    def setUp(self):
+        self.addCleanup(self.clear_fonts)
+
+    def clear_fonts(self):
+        for cached in [_font_files, font_path, get_font]:
+            cached.cache_clear()
+
+    def test_fonts_are_shared_per_size(self):
+        self.assertIs(get_font(14), get_font(14))
+        self.assertEqual(get_font(12).size, 12)
+
+    def test_configured_font_dirs_come_first(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'Arial.TTF')
+            shutil.copy(os.path.join(BUNDLED_FONT_DIR, 'Vera.ttf'), path)
+            with override_settings(TIMETABLE_FONT_DIRS=[directory]):
+                self.clear_fonts()
+                self.assertEqual(font_path(), path)
+
+    def test_bundled_font_is_the_fallback(self):
+        self.clear_fonts()
+        with mock.patch('timetable.fonts.SYSTEM_FONT_DIRS', []):
+            self.assertEqual(font_path(), os.path.join(BUNDLED_FONT_DIR, 'Vera.ttf'))
+
+
+class ImageRendererTests(TestCase):
+    """One image engine sizes the canvas to the timetable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        for hour in [9, 10]:
+            TimetableEntry.objects.create(
+                department=cls.department, faculty=Faculty.objects.create(name=f'Prof {hour}'),
+                subject='Maths', semester='Semester 1', day='Monday',
+                start_time=time(hour), end_time=time(hour + 1),
+            )
+
+    def draw(self, layout=ImageLayout):
+        return draw_timetable_image(TimetableGrid.for_semester(self.department, 'Semester 1'), layout)
+
+    def test_rows_grow_the_canvas(self):
+        short = self.draw()
+        TimetableEntry.objects.create(
+            department=self.department, subject='Lunch Break', semester='Semester 1', day='Monday',
+            start_time=time(13), end_time=time(14),
+        )
+        self.assertEqual(self.draw().height - short.height, ImageLayout.min_row_height)
+        self.assertEqual(short.width, ImageLayout.width)
+
+    def test_full_cells_make_their_row_taller(self):
+        before = self.draw().height
+        for number in range(8):
+            TimetableEntry.objects.create(
+                department=self.department, faculty=Faculty.objects.create(name=f'Lab {number}'),
+                subject='Java Lab', semester='Semester 1', day='Tuesday',
+                start_time=time(9), end_time=time(10),
+            )
+        self.assertGreater(self.draw().height, before)
+
+    def test_static_chrome_is_drawn_once(self):
+        self.assertIs(title_layer(ImageLayout), title_layer(ImageLayout))
+        self.assertIsNot(title_layer(ImageLayout), title_layer(ShareImageLayout))
+        self.assertLess(self.draw(ShareImageLayout).height, self.draw().height)
+
+
+class ImageModeTests(TestCase):
+    """Images can be encoded as full PNG, palette PNG or lossless WebP"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        TimetableEntry.objects.create(
+            department=cls.department, faculty=Faculty.objects.create(name='Prof A'), subject='Maths',
+            semester='Semester 1', day='Monday', start_time=time(9), end_time=time(10),
+        )
+
+    def test_options_come_from_the_query_string(self):
+        export = EXPORT_FORMATS['image']
+        self.assertEqual(export.options_from({'mode': 'webp', 'level': '42'}), {'mode': 'webp', 'level': 9})
+        self.assertEqual(export.options_from({'mode': 'gif'}), {'mode': 'palette', 'level': 9})
+        self.assertEqual(export.extension_for({'mode': 'webp'}), 'webp')
+
+    def test_modes_keep_the_picture(self):
+        from PIL import Image
+
+        image = draw_timetable_image(TimetableGrid.for_semester(self.department, 'Semester 1'), ImageLayout)
+        png = encode_image(image, 'png', 1)
+        palette = Image.open(BytesIO(encode_image(image, 'palette')))
+        webp = Image.open(BytesIO(encode_image(image, 'webp', 0)))
+
+        self.assertEqual(palette.mode, 'P')
+        self.assertLess(len(encode_image(image, 'palette')), len(png))
+        self.assertEqual(webp.format, 'WEBP')
+        self.assertEqual(webp.convert('RGB').tobytes(), image.tobytes())
+
+    def test_download_uses_the_chosen_mode(self):
+        url = reverse('download_timetable_image', args=[self.department.id])
+        response = self.client.get(url, {'semester': 'Semester 1', 'mode': 'webp', 'level': 0})
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('BCA_Semester_1_Timetable.webp', response['Content-Disposition'])
+
+
+class PDFExportTests(TestCase):
+    """PDF styles are shared per process and fallbacks are logged and counted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='R&D <Labs>')
+        TimetableEntry.objects.create(
+            department=cls.department, faculty=Faculty.objects.create(name='Prof <A>'), subject='C & C++',
+            semester='Semester 1', day='Monday', start_time=time(9), end_time=time(10),
+        )
+
+    def grid(self):
+        return TimetableGrid.for_semester(self.department, 'Semester 1')
+
+    def test_markup_in_names_renders_the_full_layout(self):
+        self.assertIs(pdf_styles(), pdf_styles())
+        fallbacks = pdf_render_stats().get('fallbacks', 0)
+        self.assertTrue(render_pdf(self.grid()).startswith(b'%PDF'))
+        self.assertEqual(pdf_render_stats().get('fallbacks', 0), fallbacks)
+
+    def test_fallbacks_are_logged_and_counted(self):
+        before = pdf_render_stats()
+        with mock.patch.object(TimetableDocTemplate, 'build', side_effect=ValueError('too tall')):
+            with self.assertLogs('timetable.exporters.pdf', 'WARNING') as logs:
+                content = render_pdf(self.grid())
+
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertIn('fell back to the simple layout (ValueError: too tall)', logs.output[0])
+        after = pdf_render_stats()
+        self.assertEqual(after['renders'] - before.get('renders', 0), 1)
+        self.assertEqual(after['fallback:ValueError'] - before.get('fallback:ValueError', 0), 1)
+
+
+class ExcelExportTests(TestCase):
+    """Workbooks are written in write-only mode with shared named styles"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bca = Department.objects.create(name='BCA')
+        mca = Department.objects.create(name='MCA')
+        for department, semester, name in [
+            (cls.bca, 'Semester 1', 'Prof A'), (cls.bca, 'Semester 1', 'Prof B'),
+            (cls.bca, 'Semester 2', 'Prof A'), (mca, 'Semester 1', 'Prof C'),
+        ]:
+            TimetableEntry.objects.create(
+                department=department, faculty=Faculty.objects.create(name=name), subject='Java Lab',
+                semester=semester, day='Monday', start_time=time(9), end_time=time(10),
+            )
+
+    def load(self, content):
+        from openpyxl import load_workbook
+        return load_workbook(BytesIO(content))
+
+    def test_single_timetable(self):
+        sheet = self.load(render_excel(TimetableGrid.for_semester(self.bca, 'Semester 1'))).active
+        self.assertEqual(sheet['A1'].value, 'D.H.B. SONI COLLEGE, SOLAPUR')
+        self.assertEqual(sheet['A3'].value, 'Semester 1 Timetable')
+        self.assertEqual([cell.value for cell in sheet[5]][:2], ['Time Slot', 'Monday'])
+        self.assertEqual(sheet['B6'].value, 'Java Lab (Lab)\nProf A\nProf B')
+        self.assertEqual(sheet['B6'].style, 'Timetable Lab')
+        self.assertIn('A1:G1', {str(merged) for merged in sheet.merged_cells.ranges})
+
+    def test_college_workbook_by_semester_or_department(self):
+        for sheet_per, titles in [
+            ('semester', ['BCA Semester 1', 'BCA Semester 2', 'MCA Semester 1']),
+            ('department', ['BCA', 'MCA']),
+        ]:
+            buffer = BytesIO()
+            write_workbook(buffer, TimetableGrid.for_college(), sheet_per)
+            self.assertEqual(self.load(buffer.getvalue()).sheetnames, titles)
+
+    def test_sheet_titles_are_valid_and_unique(self):
+        used = set()
+        self.assertEqual(sheet_title('B.Sc [IT]: Semester 1/2', used), 'B.Sc  IT   Semester 1 2')
+        self.assertEqual(sheet_title('b.sc  it   semester 1 2', used), 'b.sc  it   semester 1 2 (2)')
+        self.assertEqual(len(sheet_title('x' * 40, used)), 31)
+
+
+class StartupBenchmarkTests(TestCase):
+    """Fresh workers start without loading any export backend"""
+
+    def benchmark(self, **options):
+        out = StringIO()
+        call_command('benchmark_startup', repeat=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_export_backends_load_lazily(self):
+        self.assertIn('heavy modules loaded: none', self.benchmark())
+        self.assertIn('reportlab', self.benchmark(load_exporters=True))
+
+    def test_runs_without_the_resource_module(self):
+        from .management.commands import benchmark_startup
+
+        # As on Windows, where there is no resource module
+        script = "import sys\nsys.modules['resource'] = None\n" + benchmark_startup.WORKER_SCRIPT
+        with mock.patch.object(benchmark_startup, 'WORKER_SCRIPT', script):
+            output = self.benchmark()
+        self.assertIn('peak RSS MB         not available on this platform', output)
+
+
+class ArchiveSnapshotTests(TestCase):
+    """Archives are stored compactly and read back as the original entry dicts"""
+
+    ENTRIES = [
+        {'subject': 'Physics', 'faculty': 'Prof A', 'day': 'Tuesday',
+         'start_time': '01:00 PM', 'end_time': '02:00 PM'},
+        {'subject': 'Maths', 'faculty': 'Break/Recess', 'day': 'Monday',
+         'start_time': '09:00 AM', 'end_time': '10:00 AM'},
+    ]
+
+    def test_round_trip_orders_by_time(self):
+        digest, data = encode_snapshot(self.ENTRIES)
+        self.assertEqual(decode_snapshot(data), self.ENTRIES[::-1])
+
+    def test_time_objects_and_strings_encode_the_same(self):
+        as_times = [
+            dict(entry, start_time=time(13), end_time=time(14)) if entry['subject'] == 'Physics'
+            else dict(entry, start_time=time(9), end_time=time(10))
+            for entry in self.ENTRIES
+        ]
+        self.assertEqual(encode_snapshot(as_times), encode_snapshot(self.ENTRIES[::-1]))
+
+    def test_matrix_orders_slots_by_time_and_groups_labs(self):
+        lab = [
+            {'subject': 'Lab', 'faculty': name, 'day': 'Monday',
+             'start_time': '11:00 AM', 'end_time': '01:00 PM'}
+            for name in ['Prof B', 'Prof C']
+        ]
+        matrix = build_matrix(self.ENTRIES + lab)
+
+        self.assertEqual([row['time'] for row in matrix], [
+            '09:00 AM - 10:00 AM', '11:00 AM - 01:00 PM', '01:00 PM - 02:00 PM',
+        ])
+        self.assertEqual(matrix[1]['data'][0], [{
+            'is_lab': True, 'subject': 'Lab', 'faculties': ['Prof B', 'Prof C'], 'faculty': None,
+        }])
+
+    def test_identical_archives_share_a_snapshot(self):
+        department = Department.objects.create(name='BCA')
+        for _ in range(2):
+            TimetableHistory.objects.create(
+                department=department, semester='Semester 1', year=2026,
+                snapshot=ArchiveSnapshot.store(self.ENTRIES),
+            )
+        self.assertEqual(ArchiveSnapshot.objects.count(), 1)
+
+        TimetableHistory.objects.first().delete()
+        self.assertEqual(ArchiveSnapshot.objects.count(), 1)
+        TimetableHistory.objects.get().delete()
+        self.assertEqual(ArchiveSnapshot.objects.count(), 0)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Archive search uses SQLite FTS5')
+class ArchiveSearchTests(TestCase):
+    """Archives are indexed when stored and found by their contents"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        cls.other = Department.objects.create(name='MCA')
+
+        def archive(department, year, *sessions):
+            return TimetableHistory.objects.create(
+                department=department, semester='Semester 1', year=year,
+                snapshot=ArchiveSnapshot.store([
+                    {'subject': subject, 'faculty': faculty, 'day': 'Monday',
+                     'start_time': time(9 + hour), 'end_time': time(10 + hour)}
+                    for hour, (subject, faculty) in enumerate(sessions)
+                ]),
+            )
+
+        cls.both = archive(cls.department, 2024, ('Data Structures', 'Prof A'), ('Java', 'Prof B'))
+        cls.java = archive(cls.department, 2025, ('Java', 'Prof A'))
+        cls.mca = archive(cls.other, 2025, ('Data Structures', 'Prof C'))
+
+    def search(self, text, archives=None):
+        return search_archives(text, archives or TimetableHistory.objects.all())
+
+    def test_user_input_becomes_a_safe_query(self):
+        self.assertEqual(fts_query('faculty:"Prof A" data'), 'faculty : "Prof A" AND "data"*')
+        self.assertEqual(fts_query('AND ( "'), '"AND"*')
+
+    def test_finds_archives_by_contents(self):
+        self.assertEqual({record.id for record in self.search('data struct')}, {self.both.id, self.mca.id})
+        self.assertEqual(
+            [record.id for record in self.search('faculty:"Prof A" subject:java')],
+            [self.java.id],
+        )
+
+    def test_filters_and_highlights(self):
+        [record] = self.search('data structures', TimetableHistory.objects.filter(department=self.other))
+        self.assertEqual(record.id, self.mca.id)
+        self.assertEqual(record.matches, ['<mark>Data</mark> <mark>Structures</mark> — Prof C'])
+
+    def test_deleted_archives_leave_the_index(self):
+        self.java.delete()
+        self.assertEqual(self.search('faculty:"Prof A" subject:java'), [])
+
+
+class ArchiveListingTests(TestCase):
+    """History listings page by (year, created_at, id) and count from ArchiveYear"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA')
+        snapshot = ArchiveSnapshot.store([
+            {'subject': 'Maths', 'faculty': 'Prof A', 'day': 'Monday',
+             'start_time': time(9), 'end_time': time(10)},
+        ])
+        for index in range(7):
+            TimetableHistory.objects.create(
+                department=cls.department, semester='Semester 1', year=2020 + index % 3,
+                snapshot=snapshot,
+            )
+        cls.archives = TimetableHistory.objects.filter(department=cls.department)
+        cls.newest_first = list(cls.archives.order_by('-year', '-created_at', '-id'))
+
+    def test_pages_cover_every_archive_once_in_order(self):
+        seen, page = [], keyset_page(self.archives, per_page=3)
+        while True:
+            seen += page.object_list
+            if not page.has_next:
+                break
+            page = keyset_page(self.archives, after=page.next_cursor, per_page=3)
+        self.assertEqual(seen, self.newest_first)
+
+        previous = keyset_page(self.archives, before=page.previous_cursor, per_page=3)
+        self.assertEqual(previous.object_list, self.newest_first[3:6])
+
+    def test_bad_cursor_gives_the_first_page(self):
+        page = keyset_page(self.archives, after='not-a-cursor', per_page=3)
+        self.assertEqual(page.object_list, self.newest_first[:3])
+        self.assertFalse(page.has_previous)
+
+    def test_archive_years_follow_creates_and_deletes(self):
+        counts = dict(ArchiveYear.objects.values_list('year', 'archive_count'))
+        self.assertEqual(counts, {2020: 3, 2021: 2, 2022: 2})
+
+        self.archives.filter(year=2022).delete()
+        self.archives.filter(year=2020).first().delete()
+        counts = dict(ArchiveYear.objects.values_list('year', 'archive_count'))
+        self.assertEqual(counts, {2020: 2, 2021: 2})
+        self.assertEqual([row['year'] for row in ArchiveYear.years()], [2021, 2020])
+
+    def test_search_page_queries_do_not_grow_with_rows(self):
+        url = reverse('archive_search')
+        params = {'department_id': self.department.id, 'year': 2020, 'semester': 'Semester 1'}
+
+        def page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.context['search_count'], self.archives.filter(year=2020).count())
+            return len(queries)
+
+        page_queries()  # Warms the cached semester list
+        before = page_queries()
+        for _ in range(3):
+            TimetableHistory.objects.create(
+                department=self.department, semester='Semester 1', year=2020,
+                snapshot=self.newest_first[0].snapshot,
+            )
+        self.assertEqual(page_queries(), before)
+
+
+class DashboardStatsTests(TestCase):
+    """Dashboard numbers come from one query and are recomputed after writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='BCA', active_semester='Semester 2')
+        cls.faculty = Faculty.objects.create(name='Prof A', department=cls.department)
+        Faculty.objects.create(name='Visiting')
+        for semester, subject, faculty in [
+            ('Semester 1', 'Maths', cls.faculty),
+            ('Semester 2', 'Java', cls.faculty),
+            ('Semester 2', 'Lunch Break', None),
+        ]:
+            TimetableEntry.objects.create(
+                department=cls.department, faculty=faculty, subject=subject,
+                semester=semester, day='Monday', start_time=time(9), end_time=time(10),
+            )
+
+    def setUp(self):
+        caches['default'].delete(CACHE_KEY)
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = dashboard_stats()
+        with self.assertNumQueries(0):
+            dashboard_stats()
+
+        [department] = stats['departments']
+        self.assertEqual(stats['faculty_count'], 2)
+        self.assertEqual(department['faculty_count'], 1)
+        self.assertEqual(department['active_count'], 2)
+        self.assertEqual(department['class_count'], 2)
+        self.assertEqual(department['break_count'], 1)
+        self.assertEqual(department['semesters'][:2], [('Semester 1', 1), ('Semester 2', 2)])
+
+    def test_writes_invalidate_the_cache(self):
+        dashboard_stats()
+        self.faculty.delete()
+        stats = dashboard_stats()
+        self.assertEqual(stats['unassigned_count'], 2)
+        self.assertEqual(stats['class_count'], 0)
+
+    def test_entry_and_department_writes_change_the_counts(self):
+        self.assertEqual(dashboard_stats()['entry_count'], 3)
+        TimetableEntry.objects.create(
+            department=self.department, faculty=self.faculty, subject='Networks',
+            semester='Semester 2', day='Tuesday', start_time=time(9), end_time=time(10),
+        )
+        stats = dashboard_stats()
+        self.assertEqual((stats['entry_count'], stats['class_count']), (4, 3))
+
+        Department.objects.create(name='MCA')
+        self.assertEqual([row['name'] for row in dashboard_stats()['departments']], ['BCA', 'MCA'])
+
+    def test_other_workers_catch_up_after_the_timeout(self):
+        # QuerySet.update() sends no signals, like a write in another process
+        clock = 'django.core.cache.backends.locmem.time.time'
+        with mock.patch(clock, return_value=1000):
+            dashboard_stats()
+            TimetableEntry.objects.filter(subject='Java').update(faculty=None)
+            self.assertEqual(dashboard_stats()['unassigned_count'], 0)
+        with mock.patch(clock, return_value=1000 + CACHE_TIMEOUT + 1):
+            self.assertEqual(dashboard_stats()['unassigned_count'], 1)
+
+
+class SemesterConfigTests(TestCase):
+    """Semester lists come from Department.semester_count, cached per process"""
+
+    def test_lookup_is_cached_until_a_department_changes(self):
+        department = Department.objects.create(name='MCA', semester_count=4)
+        self.assertEqual(semesters_for(department.id)[-1], 'Semester 4')
+        with self.assertNumQueries(0):
+            semesters_for(department.id)
+
+        department.semester_count = 8
+        department.save()
+        self.assertEqual(len(semesters_for(department.id)), 8)
+
+    def test_timetable_page_etag_follows_the_semester_count(self):
+        # No entries, so no TimetableVersion row for a save to bump
+        department = Department.objects.create(name='MCA')
+        url = reverse('timetable_view', args=[department.id]) + '?semester=Semester 1'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        department.semester_count = 4
+        department.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Semester 5')
+
+    def test_year_count_rounds_odd_semesters_up(self):
+        counts = {semesters: Department(name='X', semester_count=semesters).year_count
+                  for semesters in (1, 4, 5, 6, 7)}
+        self.assertEqual(counts, {1: 1, 4: 2, 5: 3, 6: 3, 7: 4})
+
+        Department.objects.create(name='Diploma', semester_count=5)
+        Department.objects.create(name='Certificate', semester_count=1)
+        page = self.client.get(reverse('department_list'))
+        self.assertContains(page, '3 Years (5 Semesters)')
+        self.assertContains(page, '1 Year (1 Semester)')
+        page = self.client.get(reverse('timetable_create'))
+        self.assertContains(page, '3 Years (Sem 1-5)')
+        self.assertContains(page, '1 Year (Sem 1)')
+
+
+class FacultyWorkloadTests(TestCase):
+    """Workload counts active-semester minutes per teacher, split lecture/lab"""
+
+    def test_active_semester_minutes_with_lab_split(self):
+        department = Department.objects.create(name='BCA', active_semester='Semester 2')
+        prof_a = Faculty.objects.create(name='Prof A', department=department)
+        prof_b = Faculty.objects.create(name='Prof B', department=department)
+        Faculty.objects.create(name='Prof C', department=department)
+
+        def entry(faculty, subject, day, start, end, semester='Semester 2'):
+            TimetableEntry.objects.create(
+                department=department, faculty=faculty, subject=subject, semester=semester,
+                day=day, start_time=time(*start), end_time=time(*end),
+            )
+
+        entry(prof_a, 'Maths', 'Monday', (9,), (10, 30))
+        entry(prof_a, 'Java Lab', 'Tuesday', (11,), (13,))
+        entry(prof_b, 'Java Lab', 'Tuesday', (11,), (13,))
+        entry(prof_a, 'Physics', 'Monday', (9,), (10,), semester='Semester 1')
+
+        with self.assertNumQueries(1):
+            report = {teacher['name']: teacher for teacher in faculty_workload()}
+
+        self.assertEqual(list(report), ['Prof A', 'Prof B', 'Prof C'])
+        prof_a = report['Prof A']
+        self.assertEqual(prof_a['total_minutes'], 210)
+        self.assertEqual(prof_a['lab_minutes'], 120)
+        self.assertEqual(prof_a['lecture_minutes'], 90)
+        self.assertEqual(prof_a['sessions'], 2)
+        self.assertEqual(prof_a['days']['Monday'], 90)
+        self.assertEqual(report['Prof C']['total_minutes'], 0)
+
+
+class FacultyTimetableTests(TestCase):
+    """A teacher's week spans departments and is polled with ETags"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bca = Department.objects.create(name='BCA')
+        cls.mca = Department.objects.create(name='MCA', active_semester='Semester 2')
+        cls.faculty = Faculty.objects.create(name='Prof A', department=cls.bca)
+        for department, semester, subject in [
+            (cls.bca, 'Semester 1', 'Maths'),
+            (cls.mca, 'Semester 2', 'Cloud'),
+            (cls.mca, 'Semester 1', 'Old Course'),
+        ]:
+            TimetableEntry.objects.create(
+                department=department, faculty=cls.faculty, subject=subject, semester=semester,
+                day='Monday', start_time=time(9 if department == cls.bca else 11), end_time=time(12),
+            )
+
+    def test_week_covers_every_active_semester(self):
+        week = FacultyTimetableGrid.for_faculty(self.faculty).schedule()
+        self.assertEqual(
+            [(session['subject'], session['department']) for session in week['Monday']],
+            [('Maths', 'BCA'), ('Cloud', 'MCA')],
+        )
+
+    def test_json_is_revalidated_by_etag(self):
+        url = reverse('faculty_timetable_json', args=[self.faculty.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        TimetableEntry.objects.filter(subject='Cloud').delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['timetable']['Monday']), 1)
+
+
+class AvailabilityTests(TestCase):
+    """Common free time comes from cached bitmasks that follow every write"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bca = Department.objects.create(name='BCA')
+        cls.mca = Department.objects.create(name='MCA', active_semester='Semester 2')
+        cls.prof_a = Faculty.objects.create(name='Prof A', department=cls.bca)
+        cls.prof_b = Faculty.objects.create(name='Prof B', department=cls.mca)
+
+    def setUp(self):
+        # Rolled back test data sends no signals
+        clear_availability()
+
+    def entry(self, department, faculty, start, end, semester='Semester 1'):
+        return TimetableEntry.objects.create(
+            department=department, faculty=faculty, subject='Maths', semester=semester,
+            day='Monday', start_time=time(*start), end_time=time(*end),
+        )
+
+    def monday(self, *args, **kwargs):
+        slots = get_availability().free_slots(*args, days=['Monday'], **kwargs)
+        return [(start.strftime('%H:%M'), end.strftime('%H:%M')) for _, start, end in slots]
+
+    def test_teachers_and_classes_combine(self):
+        self.entry(self.bca, self.prof_a, (10,), (11,))
+        self.entry(self.mca, self.prof_b, (13, 5), (14,), semester='Semester 2')
+        self.entry(self.mca, self.prof_b, (9,), (12,))  # MCA Semester 1 is not active
+
+        self.assertEqual(
+            self.monday([self.prof_a.id, self.prof_b.id], [(self.bca.id, 'Semester 1')], minutes=60),
+            [('09:00', '10:00'), ('11:00', '13:05'), ('14:00', '17:00')],
+        )
+        self.assertEqual(
+            self.monday([], [(self.mca.id, 'Semester 1')], minutes=30),
+            [('12:00', '17:00')],
+        )
+
+    def test_writes_refresh_the_masks(self):
+        self.assertEqual(self.monday([self.prof_a.id]), [('09:00', '17:00')])
+        entry = self.entry(self.bca, self.prof_a, (9,), (16,))
+        self.assertEqual(self.monday([self.prof_a.id]), [('16:00', '17:00')])
+
+        self.bca.active_semester = 'Semester 2'
+        self.bca.save()
+        self.assertEqual(self.monday([self.prof_a.id]), [('09:00', '17:00')])
+        self.assertEqual(self.monday([], [(self.bca.id, entry.semester)]), [('16:00', '17:00')])
+
+    def test_api_rejects_unknown_classes(self):
+        url = reverse('free_slots_api')
+        response = self.client.get(url, {'class': f'{self.bca.id}:Semester 1', 'day': 'Monday'})
+        self.assertEqual(response.json()['slots'][0]['start_time'], '09:00')
+
+        missing = Department.objects.order_by('-id').first().id + 1
+        for value, error in [
+            (f'{missing}:Semester 1', 'Unknown department id.'),
+            (f'{self.bca.id}:Semester 7', f'Unknown class: {self.bca.id}:Semester 7'),
+        ]:
+            response = self.client.get(url, {'class': value})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['errors'], [error])
@@ -13,8 +13,16 @@ urlpatterns = [
     path('<int:dept_id>/', views.timetable_view, name='timetable_view'),
     path('timetable/<int:dept_id>/pdf/', views.download_timetable_pdf, name='download_timetable_pdf'),
     path('entry/create/', views.timetable_create, name='timetable_create'),
+    path('entry/bulk-create/', views.timetable_bulk_create, name='timetable_bulk_create'),
+    path('availability/free-slots/', views.free_slots_api, name='free_slots_api'),
     path('entry/delete/<int:entry_id>/', views.delete_entry, name='delete_entry'),
     
+    # Faculty timetables
+    path('faculty/<int:faculty_id>/', views.faculty_timetable, name='faculty_timetable'),
+    path('faculty/<int:faculty_id>/csv/', views.download_faculty_timetable_csv, name='download_faculty_timetable_csv'),
+    path('faculty/<int:faculty_id>/timetable.json', views.faculty_timetable_json, name='faculty_timetable_json'),
+    path('me/timetable.json', views.my_timetable_json, name='my_timetable_json'),
+    
     # Share routes
     path('timetable/<int:dept_id>/share/', views.share_timetable_page, name='share_timetable'),
     path('timetable/<int:dept_id>/share-image/', views.share_timetable_image, name='share_image'),
@@ -27,6 +35,22 @@ urlpatterns = [
     path('timetable/<int:dept_id>/download/', views.download_all_formats, name='download_all_formats'),
     path('download-image/<int:dept_id>/', views.download_timetable_image, name='download_timetable_image'),
     
+    # College-wide streamed dumps
+    path('export/college.csv', views.download_college_csv, name='download_college_csv'),
+    path('export/college.json', views.download_college_json, name='download_college_json'),
+    path('export/college.zip', views.download_college_bundle, name='download_college_bundle'),
+    path('export/college.xlsx', views.download_college_excel, name='download_college_excel'),
+    
+    # Reports
+    path('reports/workload/', views.faculty_workload_report, name='faculty_workload_report'),
+    path('reports/workload.csv', views.download_faculty_workload_csv, name='download_faculty_workload_csv'),
+    path('reports/workload.json', views.download_faculty_workload_json, name='download_faculty_workload_json'),
+    
+    # Background export routes
+    path('timetable/<int:dept_id>/export/', views.start_export_job, name='start_export_job'),
+    path('export-job/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('export-job/<int:job_id>/download/', views.download_export_job, name='download_export_job'),
+    
     # History routes
     path('department/<int:dept_id>/history/', views.department_history, name='department_history'),
     path('timetable/<int:dept_id>/archive/', views.archive_current_timetable, name='archive_current_timetable'),
@@ -0,0 +1,158 @@
+# timetable/versions.py
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.utils import timezone
+
+from .models import Department, ExportJob, Faculty, TimetableEntry, TimetableVersion
+
+
+def get_timetable_version(department, semester):
+    """
+    Current TimetableVersion of a timetable. A timetable that has not changed
+    since versions were introduced gets an unsaved version 0.
+    """
+    version = TimetableVersion.objects.filter(department=department, semester=semester).first()
+    return version or TimetableVersion(department=department, semester=semester)
+
+def bump_timetable_versions(timetables):
+    """Increment the version of every (department_id, semester) in `timetables`"""
+    for department_id, semester in set(timetables):
+        updated = TimetableVersion.objects.filter(
+            department_id=department_id, semester=semester
+        ).update(version=F('version') + 1, updated_at=timezone.now())
+
+        if not updated:
+            TimetableVersion.objects.get_or_create(
+                department_id=department_id, semester=semester,
+                defaults={'version': 1}
+            )
+
+def bump_department_timetables(department):
+    """The department name and active semester are shown with every timetable"""
+    TimetableVersion.objects.filter(department=department).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+
+def bump_faculty_timetables(faculty):
+    """Faculty names are printed in timetables, so a rename changes their content"""
+    bump_timetable_versions(
+        TimetableEntry.objects.filter(faculty=faculty)
+        .values_list('department_id', 'semester').distinct()
+    )
+
+def _timetable_state(request, dept_id):
+    """
+    Department name, active semester and semester count (the semester tabs)
+    plus the version of the requested semester's timetable, in one query
+    that never touches the entries table.
+    Cached on the request so the ETag and Last-Modified checks share it.
+    """
+    if not hasattr(request, '_timetable_state'):
+        semester = request.GET.get('semester', 'Semester 1')
+        versions = TimetableVersion.objects.filter(department=OuterRef('pk'), semester=semester)
+        request._timetable_state = Department.objects.filter(id=dept_id).annotate(
+            timetable_version=Subquery(versions.values('version')[:1]),
+            timetable_updated_at=Subquery(versions.values('updated_at')[:1]),
+        ).values(
+            'name', 'active_semester', 'semester_count', 'timetable_version', 'timetable_updated_at',
+        ).first()
+    return request._timetable_state
+
+def timetable_etag(request, dept_id):
+    """
+    ETag for a timetable page or download, used with @condition so repeat
+    requests for an unchanged timetable get a 304.
+    """
+    state = _timetable_state(request, dept_id)
+    if state is None:
+        return None  # Let the view raise its 404
+
+    # Flash messages are rendered into the page and must not be skipped
+    if get_messages(request):
+        return None
+
+    raw = ':'.join(str(part) for part in [
+        request.get_full_path(),
+        state['name'],
+        state['active_semester'],
+        state['semester_count'],
+        state['timetable_version'] or 0,
+        request.user.pk,  # The navbar shows who is logged in
+    ])
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def timetable_last_modified(request, dept_id):
+    state = _timetable_state(request, dept_id)
+    return state and state['timetable_updated_at']
+
+
+def _active_versions(aggregate):
+    """Subquery of `aggregate` over the versions of every active semester"""
+    versions = TimetableVersion.objects.filter(
+        semester=F('department__active_semester')
+    ).order_by().annotate(college=Value(1)).values('college')
+    return Subquery(versions.annotate(value=aggregate).values('value')[:1])
+
+def _faculty_timetable_state(request, faculty_id=None):
+    """
+    Name of the teacher plus a fingerprint of every active-semester
+    timetable, in one query that never touches the entries table. A
+    teacher's week can change through any of those timetables (their
+    entries, a rename, a department switching semester), and each of these
+    bumps a version. `faculty_id` None means the logged-in user's faculty.
+    """
+    if not hasattr(request, '_faculty_timetable_state'):
+        if faculty_id is not None:
+            faculty = Faculty.objects.filter(id=faculty_id)
+        elif request.user.is_authenticated:
+            faculty = Faculty.objects.filter(user=request.user)
+        else:
+            faculty = Faculty.objects.none()
+        request._faculty_timetable_state = faculty.annotate(
+            timetable_count=_active_versions(Count('id')),
+            version_total=_active_versions(Sum('version')),
+            timetable_updated_at=_active_versions(Max('updated_at')),
+        ).values('id', 'name', 'timetable_count', 'version_total', 'timetable_updated_at').first()
+    return request._faculty_timetable_state
+
+def faculty_timetable_etag(request, faculty_id=None):
+    state = _faculty_timetable_state(request, faculty_id)
+    if state is None:
+        return None  # Let the view raise its 404
+
+    raw = ':'.join(str(part) for part in [
+        request.get_full_path(),
+        state['id'],
+        state['name'],
+        state['timetable_count'],
+        state['version_total'] or 0,
+        state['timetable_updated_at'],
+    ])
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def faculty_timetable_last_modified(request, faculty_id=None):
+    state = _faculty_timetable_state(request, faculty_id)
+    return state and state['timetable_updated_at']
+
+
+def _export_job_state(request, job_id):
+    # A finished job's file never changes, so the job identifies its content
+    if not hasattr(request, '_export_job_state'):
+        request._export_job_state = ExportJob.objects.filter(
+            id=job_id, status=ExportJob.DONE
+        ).exclude(file='').values('id', 'version', 'file', 'finished_at').first()
+    return request._export_job_state
+
+def export_job_etag(request, job_id):
+    state = _export_job_state(request, job_id)
+    if state is None:
+        return None  # Let the view redirect to the job's status page
+
+    raw = f"{state['id']}:{state['version']}:{state['file']}"
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def export_job_last_modified(request, job_id):
+    state = _export_job_state(request, job_id)
+    return state and state['finished_at']
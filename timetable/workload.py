@@ -0,0 +1,87 @@
+# timetable/workload.py
+"""
+College-wide faculty workload.
+
+Weekly contact minutes of every teacher across all departments, counting
+only each department's active semester, split into lectures and labs and
+broken down by day. Everything comes from one aggregate query grouped by
+faculty and day; teachers without classes are included with zero load.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import Count, DurationField, Exists, ExpressionWrapper, F, Q, Sum
+
+from .grid import DAYS, shared_slot_entries
+from .models import Faculty
+
+CSV_HEADER = ['Faculty', 'Department', 'Sessions', 'Lecture Minutes', 'Lab Minutes',
+              'Total Minutes', 'Total Hours'] + DAYS
+
+
+def _minutes(duration):
+    return int((duration or timedelta()) / timedelta(minutes=1))
+
+def hours(minutes):
+    return round(minutes / 60, 2)
+
+def _workload_rows():
+    active = Q(timetableentry__semester=F('timetableentry__department__active_semester'))
+    duration = ExpressionWrapper(
+        F('timetableentry__end_time') - F('timetableentry__start_time'),
+        output_field=DurationField(),
+    )
+    return (
+        Faculty.objects
+        .values('id', 'name', 'department__name', 'timetableentry__day')
+        .annotate(
+            sessions=Count('timetableentry', filter=active),
+            total=Sum(duration, filter=active),
+            lab=Sum(duration, filter=active & Exists(shared_slot_entries('timetableentry__'))),
+        )
+        .order_by('name', 'id')
+    )
+
+def faculty_workload():
+    """
+    One dict per teacher, heaviest load first: name, department, sessions,
+    lecture/lab/total minutes and the minutes of each day in DAYS.
+    """
+    report = []
+    for _, rows in groupby(_workload_rows(), key=lambda row: row['id']):
+        rows = list(rows)
+        days = dict.fromkeys(DAYS, 0)
+        sessions = lab_minutes = total_minutes = 0
+        for row in rows:
+            # Rows of other semesters only carry NULL totals
+            if not row['sessions']:
+                continue
+            minutes = _minutes(row['total'])
+            if row['timetableentry__day'] in days:
+                days[row['timetableentry__day']] += minutes
+            total_minutes += minutes
+            lab_minutes += _minutes(row['lab'])
+            sessions += row['sessions']
+
+        report.append({
+            'id': rows[0]['id'],
+            'name': rows[0]['name'],
+            'department': rows[0]['department__name'],
+            'sessions': sessions,
+            'lecture_minutes': total_minutes - lab_minutes,
+            'lab_minutes': lab_minutes,
+            'total_minutes': total_minutes,
+            'days': days,
+        })
+
+    report.sort(key=lambda teacher: -teacher['total_minutes'])
+    return report
+
+def workload_csv_rows(report):
+    yield CSV_HEADER
+    for teacher in report:
+        yield [
+            teacher['name'], teacher['department'] or '', teacher['sessions'],
+            teacher['lecture_minutes'], teacher['lab_minutes'], teacher['total_minutes'],
+            hours(teacher['total_minutes']),
+        ] + [teacher['days'][day] for day in DAYS]